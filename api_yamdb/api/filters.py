@@ -1,6 +1,24 @@
+from django import forms
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as f
 
-from reviews.models import Title
+from reviews.constants import MAX_INTEGER, MIN_INTEGER
+from reviews.models import Category, Genre, Title
+from reviews.search import search_titles
+
+
+class IntegerFilter(f.NumberFilter):
+    """
+    Числовой фильтр, принимающий только целые числа из диапазона
+    столбца IntegerField: большее число база данных не примет.
+    """
+
+    field_class = forms.IntegerField
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('min_value', MIN_INTEGER)
+        kwargs.setdefault('max_value', MAX_INTEGER)
+        super().__init__(*args, **kwargs)
 
 
 class TitleFilter(f.FilterSet):
@@ -9,23 +27,70 @@ class TitleFilter(f.FilterSet):
     Позволяет фильтровать объекты модели Title по различным полям.
     """
 
-    category = f.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = f.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    GENRE_MODE_ANY = 'any'
+    GENRE_MODE_ALL = 'all'
+
+    category = f.CharFilter(method='filter_category')
+    genre = f.CharFilter(method='filter_genre')
+    genre_mode = f.ChoiceFilter(
+        choices=((GENRE_MODE_ANY, 'любой'), (GENRE_MODE_ALL, 'все')),
+        method='filter_genre_mode',
     )
     name = f.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    year = f.NumberFilter(
+    year = IntegerFilter(
         field_name='year',
-        lookup_expr='icontains'
     )
+    year_min = IntegerFilter(
+        field_name='year',
+        lookup_expr='gte'
+    )
+    year_max = IntegerFilter(
+        field_name='year',
+        lookup_expr='lte'
+    )
+    q = f.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        # Служебные счётчики рейтинга и дата изменения не индексированы
+        # и не являются частью API, поэтому фильтры по ним не создаются.
+        exclude = ('score_sum', 'reviews_count', 'modified')
+
+    @staticmethod
+    def get_ids_by_slugs(model, value):
+        """
+        Переводит список слагов через запятую в id одним запросом.
+        """
+        slugs = {slug.strip() for slug in value.split(',') if slug.strip()}
+        return list(
+            model.objects.filter(slug__in=slugs).values_list('id', flat=True)
+        ), len(slugs)
+
+    def filter_category(self, queryset, name, value):
+        ids, _ = self.get_ids_by_slugs(Category, value)
+        return queryset.filter(category_id__in=ids)
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Фильтрует по жанрам подзапросами EXISTS к таблице связей,
+        поэтому произведения не дублируются. В режиме any подходит
+        любой из жанров, в режиме all нужны все перечисленные.
+        """
+        ids, slugs_count = self.get_ids_by_slugs(Genre, value)
+        links = Title.genre.through.objects.filter(title_id=OuterRef('pk'))
+        if self.form.cleaned_data.get('genre_mode') != self.GENRE_MODE_ALL:
+            return queryset.filter(Exists(links.filter(genre_id__in=ids)))
+        if len(ids) < slugs_count:
+            return queryset.none()
+        for genre_id in ids:
+            queryset = queryset.filter(Exists(links.filter(genre_id=genre_id)))
+        return queryset
+
+    def filter_genre_mode(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
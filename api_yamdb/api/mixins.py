@@ -1,10 +1,44 @@
+import hashlib
+import sys
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework.mixins import (
     CreateModelMixin,
     DestroyModelMixin,
     ListModelMixin
 )
+from rest_framework import status
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from api_yamdb.cache import (
+    get_cache_version,
+    get_list_cache_version_key,
+    is_cache_shared
+)
+from .pagination import parse_limit
+
+SURROGATES_START = 0xD800
+SURROGATES_END = 0xE000
+
+
+def get_prefix_upper_bound(prefix):
+    """
+    Наименьшая строка, которая больше всех строк, начинающихся с prefix.
+    Последние символы U+10FFFF увеличить нельзя, поэтому они
+    отбрасываются; если prefix состоит только из них, границы нет.
+    Суррогатные коды пропускаются: их нельзя записать в UTF-8.
+    """
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if SURROGATES_START <= code < SURROGATES_END:
+        code = SURROGATES_END
+    return prefix[:-1] + chr(code)
+
 
 class MyModelViewSet(CreateModelMixin, ListModelMixin,
                      DestroyModelMixin, GenericViewSet):
@@ -15,3 +49,121 @@ class MyModelViewSet(CreateModelMixin, ListModelMixin,
     """
 
     pass
+
+
+class VersionedListCacheMixin:
+    """
+    Кеширует ответ действия list в кеше Django.
+    Ключ состоит из версии модели и полного URL запроса. Версию меняют
+    сигналы модели и загрузчики данных (invalidate_list_cache), поэтому
+    старые ответы больше не читаются и вытесняются из кеша по таймауту.
+    Если кеш Django локален для процесса, ответы не кешируются.
+    """
+
+    list_cache_timeout = 60 * 60
+
+    def get_list_cache_key(self, request):
+        model = self.queryset.model
+        version = get_cache_version(get_list_cache_version_key(model))
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        return f'api:list:{model._meta.label_lower}:{version}:{url}'
+
+    def list(self, request, *args, **kwargs):
+        if not is_cache_shared():
+            return super().list(request, *args, **kwargs)
+        cache_key = self.get_list_cache_key(request)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(cache_key, response.data, self.list_cache_timeout)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 на условные GET-запросы (If-None-Match,
+    If-Modified-Since) до выборки и сериализации данных.
+    Валидатором служит дата изменения из get_object_modified
+    и get_list_modified: один запрос к строке по индексу. Поэтому всё,
+    что видно в ответе, включая имена авторов, должно обновлять дату
+    изменения строки (см. сигналы reviews.signals).
+    """
+
+    def get_object_modified(self):
+        return None
+
+    def get_list_modified(self):
+        return None
+
+    def get_conditional_response(self, request, modified, handler,
+                                 *args, **kwargs):
+        if modified is None:
+            return handler(request, *args, **kwargs)
+        etag = quote_etag(hashlib.md5(
+            f'{request.get_full_path()}:{modified.timestamp()}'.encode()
+        ).hexdigest())
+        last_modified = int(modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            request, self.get_object_modified(), super().retrieve,
+            *args, **kwargs
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            request, self.get_list_modified(), super().list,
+            *args, **kwargs
+        )
+
+
+class PrefixSearchMixin:
+    """
+    Поиск по началу строки для list: ?prefix=<начало> возвращает первые
+    limit совпадений в порядке индекса по нормализованному столбцу
+    prefix_search_field, без пагинации и подсчёта всей таблицы.
+    """
+
+    prefix_search_param = 'prefix'
+    prefix_search_field = None
+    prefix_search_limit = 10
+    prefix_search_max_limit = 100
+
+    def get_prefix_search_limit(self, request):
+        return parse_limit(
+            request, self.prefix_search_limit, self.prefix_search_max_limit
+        )
+
+    def filter_by_prefix(self, queryset, prefix):
+        # Диапазон [prefix, следующая строка) использует B-tree индекс,
+        # в отличие от LIKE 'prefix%'.
+        field = self.prefix_search_field
+        lookups = {f'{field}__gte': prefix}
+        upper_bound = get_prefix_upper_bound(prefix)
+        if upper_bound is not None:
+            lookups[f'{field}__lt'] = upper_bound
+        return queryset.filter(**lookups).order_by(field)
+
+    def list(self, request, *args, **kwargs):
+        prefix = request.query_params.get(self.prefix_search_param)
+        if prefix is None:
+            return super().list(request, *args, **kwargs)
+        prefix = prefix.lower()
+        if not prefix:
+            return Response([])
+        queryset = self.filter_by_prefix(self.get_queryset(), prefix)
+        limit = self.get_prefix_search_limit(request)
+        serializer = self.get_serializer(queryset[:limit], many=True)
+        return Response(serializer.data)
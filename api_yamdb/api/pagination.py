@@ -0,0 +1,173 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def parse_limit(request, default, maximum, param='limit'):
+    """
+    Количество записей из параметра запроса: не больше maximum,
+    default для отсутствующего, нечислового или неположительного.
+    """
+    try:
+        limit = int(request.query_params[param])
+    except (KeyError, ValueError):
+        return default
+    return min(limit, maximum) if limit > 0 else default
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу: каждая страница начинается сразу после ключа
+    последней записи предыдущей страницы, без OFFSET и COUNT(*).
+    Курсор непрозрачен для клиента и содержит значения полей ordering.
+    """
+
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = api_settings.PAGE_SIZE
+    max_limit = 100
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        key, reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.reverse_ordering() if reverse else self.ordering
+        if key is not None:
+            queryset = queryset.filter(self.get_key_filter(key, ordering))
+        page = list(queryset.order_by(*ordering)[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = key is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, key is not None
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_limit(self, request):
+        return parse_limit(
+            request, self.default_limit, self.max_limit,
+            self.limit_query_param,
+        )
+
+    def reverse_ordering(self):
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    @staticmethod
+    def get_key_filter(key, ordering):
+        """
+        Условие «строго после ключа» для составного ordering:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, key):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = payload['k'], bool(payload['r'])
+            if len(values) != len(self.ordering):
+                raise ValueError
+            key = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError) as error:
+            raise NotFound(self.invalid_cursor_message) from error
+        return key, reverse
+
+    def encode_cursor(self, obj, reverse):
+        values = [
+            obj._meta.get_field(field.lstrip('-')).value_to_string(obj)
+            for field in self.ordering
+        ]
+        encoded = base64.urlsafe_b64encode(
+            json.dumps({'k': values, 'r': int(reverse)}).encode()
+        ).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return replace_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param, ''
+            )
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return replace_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param, ''
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class LimitOffsetOrKeysetPagination(LimitOffsetPagination):
+    """
+    Пагинация limit/offset по умолчанию. Если в запросе есть параметр
+    cursor (для первой страницы — пустой), используется пагинация
+    по ключу view.cursor_ordering.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if KeysetPagination.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = KeysetPagination(view.cursor_ordering)
+        return self.keyset.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+        return self.keyset.get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is None:
+            return super().to_html()
+        return ''
@@ -1,9 +1,15 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
-from rest_framework.exceptions import ValidationError
 
-from reviews.models import Comment, Review, Title, Category, Genre
+from reviews.utils import get_score_histograms
+from reviews.models import (
+    Comment,
+    Review,
+    Title,
+    TitleRanking,
+    Category,
+    Genre
+)
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -12,7 +18,7 @@ class CategorySerializer(serializers.ModelSerializer):
     """
 
     class Meta:
-        exclude = ('id',)
+        exclude = ('id', 'name_lower')
         model = Category
         lookup_field = 'slug'
 
@@ -23,7 +29,7 @@ class GenreSerializer(serializers.ModelSerializer):
     """
 
     class Meta:
-        exclude = ('id',)
+        exclude = ('id', 'name_lower')
         model = Genre
         lookup_field = 'slug'
 
@@ -41,9 +47,17 @@ class TitleSafeSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('score_sum', 'reviews_count')
         model = Title
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.context.get('score_histogram'):
+            data['score_histogram'] = get_score_histograms(
+                [instance.pk]
+            )[instance.pk]
+        return data
+
 
 class TitleNotSafeSerializer(serializers.ModelSerializer):
     """
@@ -61,10 +75,24 @@ class TitleNotSafeSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('score_sum', 'reviews_count')
         model = Title
 
 
+class TitleRankingSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для строк рейтинговых таблиц.
+    """
+
+    id = serializers.IntegerField(source='title_id')
+    name = serializers.CharField(source='title.name')
+    year = serializers.IntegerField(source='title.year')
+
+    class Meta:
+        fields = ('id', 'name', 'year', 'rating', 'reviews_count')
+        model = TitleRanking
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """
     Сериализатор для отзывов.
@@ -79,16 +107,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         validators=[MinValueValidator(1), MaxValueValidator(10)],
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method == 'POST':
-            author = request.user
-            title_id = self.context['view'].kwargs.get('title_id')
-            title = get_object_or_404(Title, pk=title_id)
-            if Review.objects.filter(title=title, author=author).exists():
-                raise ValidationError('Нельзя оставлять больше 1 отзыва!')
-        return data
-
     class Meta:
         fields = '__all__'
         model = Review
@@ -1,14 +1,40 @@
 from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from django.db import IntegrityError, transaction
+from django.db.models import Subquery
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
 
-from .mixins import MyModelViewSet
-from reviews.models import Review, Category, Genre, Title
+from .mixins import (
+    ConditionalGetMixin,
+    MyModelViewSet,
+    PrefixSearchMixin,
+    VersionedListCacheMixin
+)
+from .pagination import LimitOffsetOrKeysetPagination, parse_limit
+from reviews.constants import (
+    HISTOGRAM_MAX_TITLES,
+    LEADERBOARD_LIMIT,
+    LEADERBOARD_MAX_LIMIT,
+    MAX_BIG_INTEGER
+)
+from reviews.models import (
+    Comment,
+    Review,
+    Category,
+    Genre,
+    Title,
+    TitleRanking
+)
+from reviews.utils import get_score_histograms
 from .serializers import (
     CommentSerializer,
     ReviewSerializer,
+    TitleRankingSerializer,
     TitleSafeSerializer,
     TitleNotSafeSerializer,
     CategorySerializer,
@@ -21,20 +47,40 @@ from .permissions import (
 from .filters import TitleFilter
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Представление для отзывов.
     """
 
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthenticatedAuthorModeratoAdminOrReadOnly,)
+    pagination_class = LimitOffsetOrKeysetPagination
+    cursor_ordering = ('-pub_date', '-id')
 
     def get_title(self):
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Title, pk=title_id)
+        """
+        Произведение из URL, загружается один раз за запрос.
+        """
+        if not hasattr(self, '_title'):
+            title_id = self.kwargs.get('title_id')
+            self._title = get_object_or_404(Title, pk=title_id)
+        return self._title
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['title'] = self.get_title()
+        return context
 
     def get_queryset(self):
-        return self.get_title().reviews_title.all()
+        return self.get_title().reviews_title.select_related('author')
+
+    def get_object_modified(self):
+        return Review.objects.filter(
+            pk=self.kwargs.get('pk'), title_id=self.kwargs.get('title_id')
+        ).values_list('modified', flat=True).first()
+
+    def get_list_modified(self):
+        return self.get_title().modified
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -42,24 +88,93 @@ class ReviewViewSet(viewsets.ModelViewSet):
             return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
         return super().update(request, *args, **kwargs)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """
+        Строка отзыва блокируется до сохранения, а разница оценок
+        для счётчиков считается от заблокированного значения: иначе
+        параллельные изменения вычтут одну и ту же старую оценку.
+        """
+        review = serializer.instance
+        score = Review.objects.select_for_update().filter(
+            pk=review.pk
+        ).values_list('score', flat=True).first()
+        if score is None:
+            raise Http404
+        review._loaded_score = score
+        super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        """
+        Повторный отзыв отсекает ограничение unique_review в базе:
+        проверка до вставки лишь удвоила бы запросы и не спасла бы
+        от гонки параллельных запросов.
+        """
+        author, title = self.request.user, self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=author, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(title=title, author=author).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя оставлять больше 1 отзыва!'
+                ]
+            })
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Представление для комментариев.
     """
 
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedAuthorModeratoAdminOrReadOnly,)
+    pagination_class = LimitOffsetOrKeysetPagination
+    cursor_ordering = ('-pub_date', '-id')
 
     def get_review(self):
-        review_id = self.kwargs.get('review_id')
-        return get_object_or_404(Review, pk=review_id)
+        """
+        Отзыв из URL вместе с произведением, загружается одним запросом
+        один раз за запрос. Если отзыв относится к другому произведению,
+        возвращается 404.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
+
+    def get_title(self):
+        return self.get_review().title
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['review'] = self.get_review()
+        context['title'] = self.get_title()
+        return context
 
     def get_queryset(self):
-        return self.get_review().comments_review.all()
+        return self.get_review().comments_review.select_related(
+            'author'
+        )
+
+    def get_object_modified(self):
+        return Comment.objects.filter(
+            pk=self.kwargs.get('pk'),
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).values_list('modified', flat=True).first()
+
+    def get_list_modified(self):
+        return self.get_review().modified
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -67,21 +182,116 @@ class CommentViewSet(viewsets.ModelViewSet):
             return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
         return super().update(request, *args, **kwargs)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Представление для заголовков.
     """
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews_title__score')
-    ).all()
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (IsAuthorOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = LimitOffsetOrKeysetPagination
+    cursor_ordering = ('id',)
+    leaderboard_orderings = {
+        'rating': ('-rating_key', '-reviews_count', 'title_id'),
+        'reviews': ('-reviews_count', 'title_id'),
+    }
+    leaderboard_scopes = {
+        'category': (TitleRanking.Scope.CATEGORY, Category),
+        'genre': (TitleRanking.Scope.GENRE, Genre),
+    }
+
+    def get_object_modified(self):
+        return Title.objects.filter(
+            pk=self.kwargs.get('pk')
+        ).values_list('modified', flat=True).first()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['score_histogram'] = (
+            self.action == 'retrieve'
+            and self.request.query_params.get('histogram') in ('1', 'true')
+        )
+        return context
+
+    @action(detail=False, url_path='histograms')
+    def histograms(self, request):
+        """
+        Гистограммы оценок нескольких произведений: ?ids=1,2,3.
+        """
+        ids = request.query_params.get('ids', '')
+        try:
+            title_ids = {int(pk) for pk in ids.split(',') if pk}
+            # Большее число база данных не примет.
+            if any(not 0 < pk <= MAX_BIG_INTEGER for pk in title_ids):
+                raise ValueError
+        except ValueError:
+            raise ValidationError(
+                {'ids': ['Укажите id произведений через запятую.']}
+            )
+        if len(title_ids) > HISTOGRAM_MAX_TITLES:
+            raise ValidationError(
+                {'ids': [f'Не больше {HISTOGRAM_MAX_TITLES} произведений.']}
+            )
+        return Response(get_score_histograms(title_ids))
+
+    def get_leaderboard_filter(self, request):
+        scopes = [
+            param for param in self.leaderboard_scopes
+            if param in request.query_params
+        ]
+        if len(scopes) > 1:
+            raise ValidationError(
+                'Укажите только категорию или только жанр.'
+            )
+        if not scopes:
+            return {'scope': TitleRanking.Scope.ALL, 'scope_id': 0}
+        scope, model = self.leaderboard_scopes[scopes[0]]
+        slug = request.query_params[scopes[0]]
+        return {
+            'scope': scope,
+            'scope_id': Subquery(
+                model.objects.filter(slug=slug).values('pk')
+            ),
+        }
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """
+        Лучшие произведения из рейтинговой таблицы: общей, категории
+        (?category=<slug>) или жанра (?genre=<slug>), по рейтингу или
+        по количеству отзывов (?order=reviews).
+        """
+        order = request.query_params.get('order', 'rating')
+        if order not in self.leaderboard_orderings:
+            choices = ', '.join(self.leaderboard_orderings)
+            raise ValidationError(
+                {'order': [f'Допустимые значения: {choices}.']}
+            )
+        rankings = TitleRanking.objects.filter(
+            **self.get_leaderboard_filter(request)
+        ).select_related('title').only(
+            'title__name', 'title__year', 'rating', 'reviews_count'
+        ).order_by(*self.leaderboard_orderings[order])
+        limit = parse_limit(request, LEADERBOARD_LIMIT, LEADERBOARD_MAX_LIMIT)
+        serializer = TitleRankingSerializer(rankings[:limit], many=True)
+        return Response(serializer.data)
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
@@ -96,7 +306,9 @@ class TitleViewSet(viewsets.ModelViewSet):
         return super().update(request, *args, **kwargs)
 
 
-class CategoryViewSet(MyModelViewSet):
+class CategoryViewSet(
+    VersionedListCacheMixin, PrefixSearchMixin, MyModelViewSet
+):
     """
     Представление для категорий.
     """
@@ -106,10 +318,13 @@ class CategoryViewSet(MyModelViewSet):
     serializer_class = CategorySerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ('name',)
+    prefix_search_field = 'name_lower'
     lookup_field = 'slug'
 
 
-class GenreViewSet(MyModelViewSet):
+class GenreViewSet(
+    VersionedListCacheMixin, PrefixSearchMixin, MyModelViewSet
+):
     """
     Представление для жанров.
     """
@@ -119,4 +334,5 @@ class GenreViewSet(MyModelViewSet):
     serializer_class = GenreSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ('name',)
+    prefix_search_field = 'name_lower'
     lookup_field = 'slug'
@@ -0,0 +1,40 @@
+import uuid
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+def is_cache_shared():
+    """
+    Проверяет, что кеш Django общий для всех процессов сервера.
+    Кеш в памяти процесса не видит смены версий в других процессах,
+    поэтому версионированные записи в нём не хранятся.
+    """
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def get_cache_version(key):
+    """
+    Текущая версия группы записей кеша. Каждая версия уникальна,
+    поэтому после вытеснения ключа версии старые записи не становятся
+    снова актуальными, а одновременные смены версии не теряются.
+    """
+    return cache.get_or_set(key, uuid.uuid4().hex, None)
+
+
+def bump_cache_version(key):
+    cache.set(key, uuid.uuid4().hex, None)
+
+
+def get_list_cache_version_key(model):
+    return f'api:list-version:{model._meta.label_lower}'
+
+
+def invalidate_list_cache(model):
+    """
+    Меняет версию кешированных списков модели после фиксации транзакции.
+    """
+    transaction.on_commit(
+        lambda: bump_cache_version(get_list_cache_version_key(model))
+    )
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class LowercaseCopyField(models.CharField):
+    """
+    Индексируемая копия текстового поля source_field в нижнем регистре.
+    Значение вычисляется в pre_save, поэтому заполняется и при
+    bulk_create.
+    """
+
+    def __init__(self, *args, source_field=None, **kwargs):
+        self.source_field = source_field
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        kwargs.setdefault('default', '')
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source_field'] = self.source_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = (getattr(model_instance, self.source_field) or '').lower()
+        setattr(model_instance, self.attname, value)
+        return value
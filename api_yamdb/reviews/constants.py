@@ -1 +1,17 @@
-MAX_LENGTH = 256
\ No newline at end of file
+MAX_LENGTH = 256
+MAX_PATH_LENGTH = 512
+DIGEST_LENGTH = 40
+RANKING_SCOPE_LENGTH = 10
+LEADERBOARD_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 100
+MIN_SCORE = 1
+MAX_SCORE = 10
+HISTOGRAM_MAX_TITLES = 100
+# Средняя оценка в рейтинговых таблицах хранится умноженной на
+# RATING_PRECISION, чтобы сортировка различала дробные средние.
+RATING_PRECISION = 1000
+# Диапазоны IntegerField и первичных ключей BigAutoField, безопасные
+# для всех поддерживаемых баз данных.
+MIN_INTEGER = -2_147_483_648
+MAX_INTEGER = 2_147_483_647
+MAX_BIG_INTEGER = 9_223_372_036_854_775_807
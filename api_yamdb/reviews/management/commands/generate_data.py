@@ -0,0 +1,405 @@
+import math
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api_yamdb.cache import invalidate_list_cache
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    ScoreCount,
+    Title
+)
+from reviews.utils import rebuild_rankings
+from users.models import CustomUser
+
+BATCH_SIZE = 5000
+# Размер набора данных при --scale 1; справочники растут как корень
+# из масштаба, остальные таблицы — линейно.
+BASE_SIZES = {
+    'users': 2_000,
+    'categories': 10,
+    'genres': 30,
+    'titles': 2_000,
+    'reviews': 100_000,
+}
+SQRT_SCALED = ('categories', 'genres')
+MAX_GENRES_PER_TITLE = 3
+FIRST_YEAR = 1900
+SCORE_MEAN = 6.5
+SCORE_SPREAD = 1.5
+TITLE_SCORE_SPREAD = 1.2
+MAX_SCORE = 10
+TEXT_POOL_SIZE = 10_000
+# Отзывы публикуются равномерно за последние DATE_SPAN дней,
+# комментарии — между отзывом и текущим моментом.
+DATE_SPAN = timedelta(days=3 * 365)
+REVIEW_FIELDS = (
+    'id', 'title', 'author', 'text', 'score', 'pub_date', 'modified',
+    'comments_count',
+)
+COMMENT_FIELDS = ('id', 'review', 'author', 'text', 'pub_date', 'modified')
+WORDS = (
+    'время', 'город', 'дорога', 'друг', 'жизнь', 'звезда', 'зима', 'игра',
+    'история', 'книга', 'лес', 'любовь', 'мир', 'море', 'ночь', 'огонь',
+    'песня', 'путь', 'река', 'свет', 'сердце', 'сон', 'тень', 'утро',
+    'война', 'память', 'дом', 'небо', 'ветер', 'голос', 'сюжет', 'финал',
+)
+
+
+def get_next_id(model):
+    return (model.objects.aggregate(max_id=Max('pk'))['max_id'] or 0) + 1
+
+
+def chunked(objects, size):
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, size))
+        if not batch:
+            return
+        yield batch
+
+
+def insert_rows(model, fields, rows):
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(model._meta.get_field(field).column) for field in fields
+    )
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {quote(model._meta.db_table)} ({columns}) '
+            f'VALUES ({placeholders})',
+            rows,
+        )
+
+
+def get_sizes(scale):
+    return {
+        name: max(1, round(
+            size * (math.sqrt(scale) if name in SQRT_SCALED else scale)
+        ))
+        for name, size in BASE_SIZES.items()
+    }
+
+
+class DataGenerator:
+    """
+    Генератор синтетических данных. Первичные ключи назначаются заранее,
+    поэтому связи между таблицами строятся без повторного чтения строк,
+    а одинаковое зерно на пустой базе даёт одинаковые данные.
+    """
+
+    def __init__(self, sizes, seed, batch_size, zipf, comments_per_review,
+                 stdout):
+        self.sizes = sizes
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.zipf = zipf
+        # Число комментариев к отзыву распределено геометрически.
+        self.comment_ratio = comments_per_review / (1 + comments_per_review)
+        self.stdout = stdout
+        self.now = timezone.now()
+        self.first_ids = {}
+        # Количество отзывов с каждой оценкой по произведениям: из него
+        # получаются счётчики рейтинга и гистограммы без агрегации.
+        self.score_counts = {}
+
+    def text(self, min_words, max_words):
+        words = self.rng.choices(
+            WORDS, k=self.rng.randint(min_words, max_words)
+        )
+        return ' '.join(words)
+
+    def text_pool(self, min_words, max_words):
+        return [
+            self.text(min_words, max_words) for _ in range(TEXT_POOL_SIZE)
+        ]
+
+    def ids(self, name):
+        first = self.first_ids[name]
+        return range(first, first + self.sizes[name])
+
+    def insert(self, model, name, objects):
+        """
+        Вставляет объекты пачками bulk_create и сообщает скорость.
+        """
+        self.first_ids[name] = get_next_id(model)
+        started = time.monotonic()
+        count = 0
+        for batch in chunked(objects(), self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            count += len(batch)
+        self.report(f'Таблица {model._meta.db_table}', count, started)
+
+    def report(self, label, count, started):
+        elapsed = time.monotonic() - started
+        rate = count / elapsed if elapsed else count
+        self.stdout.write(f'{label}: {count} строк, {rate:.0f} строк/с.')
+
+    def users(self):
+        for pk in self.ids('users'):
+            yield CustomUser(
+                id=pk,
+                username=f'synthetic{pk}',
+                email=f'synthetic{pk}@yamdb.fake',
+                password='!',
+            )
+
+    def categories(self):
+        for pk in self.ids('categories'):
+            yield Category(
+                id=pk,
+                name=f'{self.text(1, 2).capitalize()} {pk}',
+                slug=f'category-{pk}',
+            )
+
+    def genres(self):
+        for pk in self.ids('genres'):
+            yield Genre(
+                id=pk,
+                name=f'{self.text(1, 2).capitalize()} {pk}',
+                slug=f'genre-{pk}',
+            )
+
+    def titles(self):
+        categories = self.ids('categories')
+        last_year = timezone.now().year
+        for pk in self.ids('titles'):
+            yield Title(
+                id=pk,
+                name=self.text(1, 4).capitalize(),
+                year=self.rng.randint(FIRST_YEAR, last_year),
+                category_id=self.rng.choice(categories),
+                description=self.text(10, 30),
+            )
+
+    def genre_links(self):
+        genres = self.ids('genres')
+        for title_id in self.ids('titles'):
+            count = self.rng.randint(1, min(MAX_GENRES_PER_TITLE, len(genres)))
+            for genre_id in self.rng.sample(genres, count):
+                yield Title.genre.through(title_id=title_id, genre_id=genre_id)
+
+    def review_counts(self):
+        """
+        Количество отзывов каждого произведения по закону Ципфа:
+        произведение ранга r получает долю, пропорциональную r^-zipf.
+        Ранги раздаются произведениям в случайном порядке.
+        """
+        titles = list(self.ids('titles'))
+        self.rng.shuffle(titles)
+        weights = [rank ** -self.zipf for rank in range(1, len(titles) + 1)]
+        remaining, remaining_weight = self.sizes['reviews'], sum(weights)
+        for title_id, weight in zip(titles, weights):
+            expected = remaining * weight / remaining_weight
+            count = int(expected) + (self.rng.random() < expected % 1)
+            # Один пользователь оставляет не больше одного отзыва;
+            # не доставшиеся популярным произведениям отзывы
+            # распределяются между остальными.
+            count = min(count, self.sizes['users'], remaining)
+            remaining -= count
+            remaining_weight -= weight
+            yield title_id, count
+
+    def date_after(self, start):
+        """
+        Случайный момент между start и началом генерации.
+        """
+        seconds = (self.now - start).total_seconds()
+        return start + timedelta(seconds=self.rng.uniform(0, seconds))
+
+    def comments_count(self):
+        if not self.comment_ratio:
+            return 0
+        return int(
+            math.log(1.0 - self.rng.random()) / math.log(self.comment_ratio)
+        )
+
+    def reviews(self):
+        """
+        Строки отзывов вместе со строками их комментариев: оценки
+        разбросаны вокруг «качества» произведения, авторы отзывов
+        на одно произведение различны, комментарии опубликованы
+        не раньше отзыва.
+        """
+        adapt_date = connection.ops.adapt_datetimefield_value
+        first_date = self.now - DATE_SPAN
+        users = self.ids('users')
+        review_id = get_next_id(Review)
+        comment_id = get_next_id(Comment)
+        review_texts = self.text_pool(5, 30)
+        comment_texts = self.text_pool(3, 15)
+        for title_id, count in self.review_counts():
+            quality = self.rng.gauss(SCORE_MEAN, TITLE_SCORE_SPREAD)
+            score_counts = self.score_counts[title_id] = [0] * (MAX_SCORE + 1)
+            for author_id in self.rng.sample(users, count):
+                score = round(self.rng.gauss(quality, SCORE_SPREAD))
+                score = min(max(score, 1), MAX_SCORE)
+                score_counts[score] += 1
+                pub_date = self.date_after(first_date)
+                comment_dates = [
+                    adapt_date(date) for date in sorted(
+                        self.date_after(pub_date)
+                        for _ in range(self.comments_count())
+                    )
+                ]
+                comments = [
+                    (
+                        comment_id + number, review_id,
+                        self.rng.choice(users), self.rng.choice(comment_texts),
+                        date, date,
+                    )
+                    for number, date in enumerate(comment_dates)
+                ]
+                pub_date = adapt_date(pub_date)
+                # Комментарий обновляет дату изменения отзыва.
+                modified = comment_dates[-1] if comment_dates else pub_date
+                yield (
+                    review_id, title_id, author_id,
+                    self.rng.choice(review_texts), score,
+                    pub_date, modified, len(comments),
+                ), comments
+                review_id += 1
+                comment_id += len(comments)
+
+    def insert_reviews(self):
+        """
+        Отзывы и комментарии — самые большие таблицы, поэтому строки
+        вставляются через executemany без создания объектов моделей.
+        """
+        started = time.monotonic()
+        reviews_total = comments_total = 0
+        for batch in chunked(self.reviews(), self.batch_size):
+            comments = [comment for _, items in batch for comment in items]
+            with transaction.atomic():
+                insert_rows(Review, REVIEW_FIELDS, [row for row, _ in batch])
+                insert_rows(Comment, COMMENT_FIELDS, comments)
+            reviews_total += len(batch)
+            comments_total += len(comments)
+        self.report(
+            f'Таблицы {Review._meta.db_table} ({reviews_total}) '
+            f'и {Comment._meta.db_table} ({comments_total})',
+            reviews_total + comments_total, started,
+        )
+
+    def generate(self):
+        if connection.vendor == 'sqlite':
+            # Синтетические данные всегда можно создать заново, поэтому
+            # SQLite не ждёт сброса каждой транзакции на диск.
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
+                cursor.execute('PRAGMA cache_size = -262144')
+        self.insert(CustomUser, 'users', self.users)
+        self.insert(Category, 'categories', self.categories)
+        self.insert(Genre, 'genres', self.genres)
+        self.insert(Title, 'titles', self.titles)
+        self.insert(Title.genre.through, 'genre_links', self.genre_links)
+        self.insert_reviews()
+        models = (CustomUser, Category, Genre, Title, Review, Comment)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+        for model in models:
+            invalidate_list_cache(model)
+        # bulk_create не вызывает сигналы, поэтому счётчики произведений,
+        # гистограммы оценок и рейтинговые таблицы заполняются здесь.
+        started = time.monotonic()
+        with transaction.atomic():
+            self.save_score_counters()
+            rebuild_rankings()
+        self.report(
+            'Счётчики и рейтинги произведений', len(self.score_counts),
+            started,
+        )
+
+    def save_score_counters(self):
+        quote = connection.ops.quote_name
+        counters = [
+            (
+                sum(score * count for score, count in enumerate(counts)),
+                sum(counts),
+                title_id,
+            )
+            for title_id, counts in self.score_counts.items()
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {quote(Title._meta.db_table)} '
+                'SET score_sum = %s, reviews_count = %s WHERE id = %s',
+                counters,
+            )
+        insert_rows(ScoreCount, ('title', 'score', 'count'), [
+            (title_id, score, count)
+            for title_id, counts in self.score_counts.items()
+            for score, count in enumerate(counts) if count
+        ])
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетический набор данных: пользователей, категории, '
+        'жанры, произведения, отзывы и комментарии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help=(
+                'Масштаб набора данных: при 1 создаётся '
+                f'{BASE_SIZES["reviews"]} отзывов, при 100 — в сто раз больше.'
+            ),
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора случайных чисел.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Размер пакета bulk_create.',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.0,
+            help='Показатель распределения Ципфа отзывов по произведениям.',
+        )
+        parser.add_argument(
+            '--comments-per-review',
+            type=float,
+            default=0.5,
+            help='Среднее количество комментариев к отзыву.',
+        )
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('Масштаб должен быть больше нуля.')
+        if options['comments_per_review'] < 0:
+            raise CommandError(
+                'Количество комментариев не может быть отрицательным.'
+            )
+        sizes = get_sizes(options['scale'])
+        generator = DataGenerator(
+            sizes, options['seed'], options['batch_size'], options['zipf'],
+            options['comments_per_review'], self.stdout,
+        )
+        generator.generate()
+        self.stdout.write(self.style.SUCCESS('Данные сгенерированы'))
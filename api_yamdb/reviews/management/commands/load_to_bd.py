@@ -1,19 +1,35 @@
 import csv
+import gzip
+import hashlib
+import time
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
 
 from django.core.management import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.conf import settings
 
+from api_yamdb.cache import invalidate_list_cache
 from reviews.models import (
     Category,
     Comment,
     Genre,
     GenreTitle,
+    ImportCheckpoint,
     Review,
     Title
 )
+from reviews.utils import (
+    rebuild_comment_counters,
+    rebuild_rating_counters,
+    rebuild_score_histograms
+)
 from users.models import CustomUser
 
+BATCH_SIZE = 1000
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
 TABLES = {
     CustomUser: 'users.csv',
     Category: 'category.csv',
@@ -33,13 +49,33 @@ FIELDS = {
 }
 
 
-def open_csv_file(file_name):
-    csv_path = f'{settings.BASE_DIR}/static/data/{file_name}'
-    try:
-        with open(csv_path, encoding='utf-8') as file:
-            return list(csv.reader(file))
-    except FileNotFoundError:
+def read_csv_rows(csv_path):
+    """Построчно читает csv-файл, в том числе сжатый gzip."""
+    opener = gzip.open if csv_path.suffix == '.gz' else open
+    with opener(csv_path, 'rt', encoding='utf-8') as file:
+        yield from csv.reader(file)
+
+
+def find_csv_file(file_name, data_dir=DATA_DIR):
+    """
+    Возвращает полный путь к csv-файлу из каталога data_dir.
+    Если рядом лежит только сжатая версия файла, возвращается она.
+    """
+    csv_path = Path(data_dir) / file_name
+    if not csv_path.exists():
+        csv_path = csv_path.with_name(f'{file_name}.gz')
+    if not csv_path.exists():
         print(f'Файл {file_name} не найден.')
+        return None
+    return csv_path.resolve()
+
+
+def open_csv_file(file_name, data_dir=DATA_DIR):
+    """Возвращает итератор строк csv-файла из каталога data_dir."""
+    csv_path = find_csv_file(file_name, data_dir)
+    if csv_path is None:
+        return None
+    return read_csv_rows(csv_path)
 
 
 def change_foreign_values(data_csv):
@@ -52,14 +88,16 @@ def change_foreign_values(data_csv):
     return data_csv_copy
 
 
-def load_csv(model, file_name):
+def load_csv(model, file_name, data_dir=DATA_DIR):
     """Осуществляет загрузку csv-файлов."""
     table_not_loaded = f'Таблица {file_name} не загружена.'
     table_loaded = f'Таблица {file_name} загружена.'
-    data = open_csv_file(file_name)
-    rows = data[1:]
+    rows = open_csv_file(file_name, data_dir)
+    if rows is None:
+        return
+    header = next(rows, ())
     for row in rows:
-        data_csv = dict(zip(data[0], row))
+        data_csv = dict(zip(header, row))
         data_csv = change_foreign_values(data_csv)
         try:
             table = model(**data_csv)
@@ -71,8 +109,211 @@ def load_csv(model, file_name):
     print(table_loaded)
 
 
+def build_id_maps(header):
+    """
+    Строит словари id связанных объектов для внешних ключей таблицы.
+    Каждая связанная таблица читается один раз.
+    """
+    id_maps = {}
+    for key in header:
+        if key in FIELDS:
+            field_key, related_model = FIELDS[key]
+            id_maps[key] = (
+                f'{field_key}_id',
+                {
+                    str(pk): pk for pk in
+                    related_model.objects.values_list('pk', flat=True)
+                },
+            )
+    return id_maps
+
+
+def change_foreign_ids(data_csv, id_maps):
+    data_csv_copy = {}
+    for key, value in data_csv.items():
+        if key in id_maps:
+            attname, ids = id_maps[key]
+            if value not in ids:
+                raise ValueError(
+                    f'Объект {FIELDS[key][1].__name__} с id={value} '
+                    'не найден'
+                )
+            data_csv_copy[attname] = ids[value]
+        else:
+            data_csv_copy[key] = value
+    return data_csv_copy
+
+
+def iter_batches(model, header, rows, batch_size):
+    """Собирает объекты модели из строк csv-файла пакетами."""
+    id_maps = build_id_maps(header)
+    while True:
+        batch = [
+            model(**change_foreign_ids(dict(zip(header, row)), id_maps))
+            for row in islice(rows, batch_size)
+        ]
+        if not batch:
+            return
+        yield batch
+
+
+def hash_rows(rows, digest):
+    """Добавляет в хеш каждую прочитанную строку csv-файла."""
+    for row in rows:
+        digest.update('\x1f'.join(row).encode() + b'\x1e')
+        yield row
+
+
+def is_checkpoint_actual(checkpoint, rows, digest):
+    """
+    Пропускает уже загруженные строки и сверяет их хеш с контрольной
+    точкой: если файл изменился, продолжать загрузку с сохранённой
+    строки нельзя.
+    """
+    if not checkpoint.rows_loaded and not checkpoint.finished:
+        return True
+    for _ in islice(rows, checkpoint.rows_loaded):
+        pass
+    if digest.hexdigest() != checkpoint.digest:
+        return False
+    return not checkpoint.finished or next(rows, None) is None
+
+
+def advance_checkpoint(checkpoint, digest, rows=0, finished=False):
+    """Сдвигает контрольную точку загрузки, если она используется."""
+    if checkpoint is None:
+        return
+    checkpoint.rows_loaded += rows
+    checkpoint.finished = finished
+    checkpoint.digest = digest.hexdigest()
+    checkpoint.save(update_fields=('rows_loaded', 'finished', 'digest'))
+
+
+def get_checkpoint(file_name, csv_path, rows, digest):
+    """
+    Контрольная точка файла по его полному пути. Возвращает None,
+    если загружать файл не нужно.
+    """
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+        file_name=str(csv_path)
+    )
+    if not is_checkpoint_actual(checkpoint, rows, digest):
+        print(f'Файл {file_name} изменился после прошлой загрузки. '
+              'Запустите загрузку с --restart.')
+        return None
+    if checkpoint.finished:
+        print(f'Таблица {file_name} уже загружена.')
+        return None
+    return checkpoint
+
+
+def load_csv_bulk(model, file_name, batch_size=BATCH_SIZE,
+                  data_dir=DATA_DIR, resume=False):
+    """
+    Загружает csv-файл пакетами bulk_create.
+    Обычно вся таблица загружается в одной транзакции. В режиме resume
+    каждый пакет фиксируется вместе с контрольной точкой, и повторный
+    запуск продолжает загрузку с последнего зафиксированного пакета.
+    Контрольная точка привязана к полному пути файла и хешу загруженных
+    строк, поэтому другой или изменённый файл не продолжает чужую
+    загрузку.
+    """
+    csv_path = find_csv_file(file_name, data_dir)
+    if csv_path is None:
+        return
+    digest = hashlib.sha1()
+    rows = read_csv_rows(csv_path)
+    if resume:
+        rows = hash_rows(rows, digest)
+    header = next(rows, ())
+    checkpoint = None
+    if resume:
+        checkpoint = get_checkpoint(file_name, csv_path, rows, digest)
+        if checkpoint is None:
+            return
+    table_atomic = nullcontext if resume else transaction.atomic
+    batch_atomic = transaction.atomic if resume else nullcontext
+    loaded = 0
+    started = time.monotonic()
+    try:
+        with table_atomic():
+            for batch in iter_batches(model, header, rows, batch_size):
+                with batch_atomic():
+                    model.objects.bulk_create(batch)
+                    # bulk_create не вызывает сигналы модели.
+                    invalidate_list_cache(model)
+                    advance_checkpoint(checkpoint, digest, rows=len(batch))
+                loaded += len(batch)
+            with batch_atomic():
+                if model is Review:
+                    rebuild_rating_counters()
+                    rebuild_score_histograms()
+                if model is Comment:
+                    rebuild_comment_counters()
+                advance_checkpoint(checkpoint, digest, finished=True)
+    except (ValueError, IntegrityError) as error:
+        print(f'Ошибка в загружаемых данных. {error}. '
+              f'Таблица {file_name} не загружена.')
+        return
+    elapsed = time.monotonic() - started
+    rate = loaded / elapsed if elapsed else loaded
+    print(f'Таблица {file_name} загружена: {loaded} строк, '
+          f'{rate:.0f} строк/с.')
+
+
+def delete_checkpoints(data_dir=DATA_DIR):
+    """Удаляет контрольные точки файлов каталога data_dir."""
+    data_dir = Path(data_dir).resolve()
+    ImportCheckpoint.objects.filter(file_name__in=[
+        str(data_dir / name)
+        for file_name in TABLES.values()
+        for name in (file_name, f'{file_name}.gz')
+    ]).delete()
+
+
 class Command(BaseCommand):
+    help = 'Загружает данные из csv-файлов в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Загружать таблицы пакетами bulk_create в транзакции.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Размер пакета для режима --bulk.',
+        )
+        parser.add_argument(
+            '--data-dir',
+            default=DATA_DIR,
+            help='Каталог с csv-файлами (допускаются файлы .csv.gz).',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Фиксировать каждый пакет с контрольной точкой и '
+                 'продолжать прерванную загрузку (включает --bulk).',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Удалить контрольные точки файлов каталога и загрузить '
+                 'их заново (включает --resume).',
+        )
+
     def handle(self, *args, **options):
+        if options['restart']:
+            delete_checkpoints(options['data_dir'])
+            options['resume'] = True
         for molel, csv_file in TABLES.items():
-            load_csv(molel, csv_file)
+            if options['bulk'] or options['resume']:
+                load_csv_bulk(
+                    molel, csv_file, options['batch_size'],
+                    options['data_dir'], options['resume'],
+                )
+            else:
+                load_csv(molel, csv_file, options['data_dir'])
         self.stdout.write(self.style.SUCCESS('Все данные загружены'))
@@ -0,0 +1,34 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from reviews.search import (
+    check_title_search,
+    is_search_supported,
+    rebuild_title_search
+)
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить индекс, ничего не изменяя.',
+        )
+
+    def handle(self, *args, **options):
+        if not is_search_supported():
+            raise CommandError(
+                'Полнотекстовый индекс доступен только для SQLite.'
+            )
+        if options['check']:
+            try:
+                check_title_search()
+            except DatabaseError as error:
+                raise CommandError(f'Индекс повреждён: {error}')
+            self.stdout.write(self.style.SUCCESS('Индекс корректен'))
+            return
+        rebuild_title_search()
+        self.stdout.write(self.style.SUCCESS('Индекс перестроен'))
@@ -0,0 +1,36 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.utils import get_stale_comment_counters, rebuild_comment_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев отзывов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не изменяя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = get_stale_comment_counters()
+            for review in stale:
+                self.stdout.write(
+                    f'Отзыв {review.pk}: счётчик комментариев '
+                    'не совпадает с комментариями.'
+                )
+            if stale:
+                raise CommandError(
+                    f'Некорректных счётчиков: {len(stale)}.'
+                )
+            self.stdout.write(self.style.SUCCESS('Счётчики корректны'))
+            return
+
+        with transaction.atomic():
+            stale = rebuild_comment_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано отзывов: {len(stale)}')
+        )
@@ -0,0 +1,51 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.utils import (
+    get_stale_rating_counters,
+    get_stale_score_histograms,
+    rebuild_rating_counters,
+    rebuild_score_histograms
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики рейтинга и оценок произведений по отзывам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не изменяя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = get_stale_rating_counters()
+            for title in stale:
+                self.stdout.write(
+                    f'Произведение {title.pk}: счётчики рейтинга '
+                    'не совпадают с отзывами.'
+                )
+            stale_histograms = get_stale_score_histograms()
+            for title_id in stale_histograms:
+                self.stdout.write(
+                    f'Произведение {title_id}: счётчики оценок '
+                    'не совпадают с отзывами.'
+                )
+            if stale or stale_histograms:
+                raise CommandError(
+                    'Некорректных счётчиков: '
+                    f'{len(stale) + len(stale_histograms)}.'
+                )
+            self.stdout.write(self.style.SUCCESS('Счётчики корректны'))
+            return
+
+        with transaction.atomic():
+            stale = rebuild_rating_counters()
+            rebuild_score_histograms()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {len(stale)}')
+        )
@@ -0,0 +1,32 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.utils import get_stale_rankings, rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает рейтинговые таблицы произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинговые таблицы, ничего не изменяя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = get_stale_rankings()
+            for scope, scope_id, title_id in stale:
+                self.stdout.write(
+                    f'Таблица {scope} {scope_id}, произведение {title_id}: '
+                    'строка не совпадает со счётчиками.'
+                )
+            if stale:
+                raise CommandError(f'Некорректных строк: {len(stale)}.')
+            self.stdout.write(self.style.SUCCESS('Рейтинги корректны'))
+            return
+
+        with transaction.atomic():
+            rebuild_rankings()
+        self.stdout.write(self.style.SUCCESS('Рейтинги пересобраны'))
@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=256, unique=True, verbose_name='Файл')),
+                ('rows_loaded', models.PositiveBigIntegerField(default=0, verbose_name='Загружено строк')),
+                ('finished', models.BooleanField(default=False, verbose_name='Загрузка завершена')),
+            ],
+            options={
+                'verbose_name': 'контрольная точка загрузки',
+                'verbose_name_plural': 'Контрольные точки загрузки',
+            },
+        ),
+    ]
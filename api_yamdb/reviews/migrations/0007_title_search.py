@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 08:05
+
+from django.db import migrations
+
+from reviews.search import create_title_search, drop_title_search
+
+
+def create_search(apps, schema_editor):
+    create_title_search(schema_editor.connection)
+
+
+def drop_search(apps, schema_editor):
+    drop_title_search(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_modified_dates'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search, drop_search),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-18 07:26
+
+from django.db import migrations
+import api_yamdb.fields
+
+
+def fill_name_lower(apps, schema_editor):
+    for model_name in ('Category', 'Genre'):
+        model = apps.get_model('reviews', model_name)
+        objects = list(model.objects.all())
+        for obj in objects:
+            obj.name_lower = obj.name.lower()
+        model.objects.bulk_update(objects, ('name_lower',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='name_lower',
+            field=api_yamdb.fields.LowercaseCopyField(db_index=True, default='', editable=False, max_length=256, source_field='name', verbose_name='Название категории в нижнем регистре'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_lower',
+            field=api_yamdb.fields.LowercaseCopyField(db_index=True, default='', editable=False, max_length=256, source_field='name', verbose_name='Название жанра в нижнем регистре'),
+        ),
+        migrations.RunPython(fill_name_lower, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.2 on 2026-10-18 07:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_title_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    rankings = []
+    titles = Title.objects.filter(reviews_count__gt=0).prefetch_related(
+        'genre'
+    )
+    for title in titles:
+        scopes = [('all', 0)]
+        if title.category_id:
+            scopes.append(('category', title.category_id))
+        scopes += [('genre', genre.pk) for genre in title.genre.all()]
+        rankings += [
+            TitleRanking(
+                scope=scope,
+                scope_id=scope_id,
+                title_id=title.pk,
+                rating=title.score_sum // title.reviews_count,
+                score_sum=title.score_sum,
+                reviews_count=title.reviews_count,
+            )
+            for scope, scope_id in scopes
+        ]
+    TitleRanking.objects.bulk_create(rankings, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_year_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'All'), ('category', 'Category'), ('genre', 'Genre')], max_length=10, verbose_name='Таблица')),
+                ('scope_id', models.PositiveIntegerField(default=0, verbose_name='Категория или жанр')),
+                ('rating', models.PositiveSmallIntegerField(verbose_name='Рейтинг')),
+                ('score_sum', models.PositiveIntegerField(verbose_name='Сумма оценок')),
+                ('reviews_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'строка рейтинга',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['scope', 'scope_id', '-rating', '-reviews_count', 'title'], name='ranking_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['scope', 'scope_id', '-reviews_count', 'title'], name='ranking_reviews_count_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'title'), name='unique_title_ranking'),
+        ),
+        migrations.RunPython(
+            fill_title_rankings, migrations.RunPython.noop
+        ),
+    ]
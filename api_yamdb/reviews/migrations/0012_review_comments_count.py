@@ -0,0 +1,32 @@
+# Generated by Django 3.2 on 2026-10-18 07:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comments_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    reviews = list(Review.objects.annotate(
+        count=Count('comments_review')
+    ).filter(count__gt=0))
+    for review in reviews:
+        review.comments_count = review.count
+    Review.objects.bulk_update(reviews, ('comments_count',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_scorecount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(
+            fill_comments_count, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 08:40
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_rating_key(apps, schema_editor):
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    TitleRanking.objects.update(
+        rating_key=F('score_sum') * 1000 / F('reviews_count')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='titleranking',
+            name='ranking_rating_idx',
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='rating_key',
+            field=models.PositiveIntegerField(default=0, verbose_name='Средняя оценка для сортировки'),
+        ),
+        migrations.RunPython(
+            fill_rating_key, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['scope', 'scope_id', '-rating_key', '-reviews_count', 'title'], name='ranking_rating_idx'),
+        ),
+    ]
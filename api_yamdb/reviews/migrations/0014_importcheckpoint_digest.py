@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_titleranking_rating_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='digest',
+            field=models.CharField(blank=True, max_length=40, verbose_name='Хеш загруженных строк'),
+        ),
+        migrations.AlterField(
+            model_name='importcheckpoint',
+            name='file_name',
+            field=models.CharField(max_length=512, unique=True, verbose_name='Путь к файлу'),
+        ),
+    ]
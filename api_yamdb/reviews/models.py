@@ -1,10 +1,16 @@
 from django.db import models
 from django.core.validators import MaxValueValidator, MinValueValidator
 
+from api_yamdb.fields import LowercaseCopyField
 from users.models import CustomUser
 
 from .validators import validate_year
-from .constants import MAX_LENGTH
+from .constants import (
+    DIGEST_LENGTH,
+    MAX_LENGTH,
+    MAX_PATH_LENGTH,
+    RANKING_SCOPE_LENGTH
+)
 
 
 class Category(models.Model):
@@ -20,6 +26,11 @@ class Category(models.Model):
         'Слаг категории',
         unique=True,
     )
+    name_lower = LowercaseCopyField(
+        'Название категории в нижнем регистре',
+        max_length=MAX_LENGTH,
+        source_field='name',
+    )
 
     class Meta:
         verbose_name = 'категория'
@@ -42,6 +53,11 @@ class Genre(models.Model):
         'Слаг жанра',
         unique=True,
     )
+    name_lower = LowercaseCopyField(
+        'Название жанра в нижнем регистре',
+        max_length=MAX_LENGTH,
+        source_field='name',
+    )
 
     class Meta:
         verbose_name = 'жанр'
@@ -83,14 +99,40 @@ class Title(models.Model):
         related_name='titles_genre',
         verbose_name='Жанр',
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    modified = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
 
     class Meta:
         verbose_name = 'произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=('year',), name='title_year_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """
+        Средняя оценка по накопленным счётчикам, без агрегации отзывов.
+        """
+        if not self.reviews_count:
+            return None
+        return self.score_sum // self.reviews_count
+
 
 class GenreTitle(models.Model):
     """
@@ -147,10 +189,29 @@ class Review(models.Model):
         'Дата публикации',
         auto_now_add=True,
     )
+    modified = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date'),
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='review_author_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=('title', 'author',),
@@ -161,6 +222,12 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
 
 class Comment(models.Model):
     """
@@ -187,10 +254,145 @@ class Comment(models.Model):
         'Дата публикации',
         auto_now_add=True,
     )
+    modified = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date'),
+                name='comment_review_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='comment_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class TitleRanking(models.Model):
+    """
+    Модель строки рейтинговой таблицы произведений: общей,
+    по категории или по жанру.
+    """
+
+    class Scope(models.TextChoices):
+        ALL = 'all'
+        CATEGORY = 'category'
+        GENRE = 'genre'
+
+    scope = models.CharField(
+        'Таблица',
+        choices=Scope.choices,
+        max_length=RANKING_SCOPE_LENGTH,
+    )
+    scope_id = models.PositiveIntegerField(
+        'Категория или жанр',
+        default=0,
+    )
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        related_name='rankings',
+        on_delete=models.CASCADE,
+    )
+    rating = models.PositiveSmallIntegerField('Рейтинг')
+    rating_key = models.PositiveIntegerField(
+        'Средняя оценка для сортировки',
+        default=0,
+    )
+    score_sum = models.PositiveIntegerField('Сумма оценок')
+    reviews_count = models.PositiveIntegerField('Количество отзывов')
+
+    class Meta:
+        verbose_name = 'строка рейтинга'
+        verbose_name_plural = 'Рейтинги произведений'
+        indexes = [
+            models.Index(
+                fields=(
+                    'scope', 'scope_id', '-rating_key', '-reviews_count',
+                    'title',
+                ),
+                name='ranking_rating_idx',
+            ),
+            models.Index(
+                fields=('scope', 'scope_id', '-reviews_count', 'title'),
+                name='ranking_reviews_count_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=('scope', 'scope_id', 'title'),
+                name='unique_title_ranking',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.scope} {self.scope_id}: {self.title_id}'
+
+
+class ScoreCount(models.Model):
+    """
+    Модель счётчика отзывов произведения с одной оценкой.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        related_name='score_counts',
+        on_delete=models.CASCADE,
+    )
+    score = models.PositiveSmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Количество отзывов', default=0)
+
+    class Meta:
+        verbose_name = 'счётчик оценок'
+        verbose_name_plural = 'Счётчики оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('title', 'score'),
+                name='unique_score_count',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Модель контрольной точки загрузки csv-файла.
+    """
+
+    file_name = models.CharField(
+        'Путь к файлу',
+        max_length=MAX_PATH_LENGTH,
+        unique=True,
+    )
+    rows_loaded = models.PositiveBigIntegerField(
+        'Загружено строк',
+        default=0,
+    )
+    digest = models.CharField(
+        'Хеш загруженных строк',
+        max_length=DIGEST_LENGTH,
+        blank=True,
+    )
+    finished = models.BooleanField(
+        'Загрузка завершена',
+        default=False,
+    )
+
+    class Meta:
+        verbose_name = 'контрольная точка загрузки'
+        verbose_name_plural = 'Контрольные точки загрузки'
+
+    def __str__(self):
+        return f'{self.file_name}: {self.rows_loaded}'
@@ -0,0 +1,132 @@
+"""
+Полнотекстовый поиск произведений на SQLite FTS5.
+
+Индекс reviews_title_fts хранит только токены: содержимое читается из
+reviews_title (external content), а триггеры на reviews_title держат
+индекс в актуальном состоянии при любых изменениях, в том числе при
+bulk_create и update. SQLite пересоздаёт таблицу при некоторых
+миграциях и при этом удаляет триггеры, поэтому такие миграции должны
+заново вызвать create_title_search_triggers.
+"""
+import re
+
+from django.db import connection
+
+TITLE_SEARCH_TABLE = 'reviews_title_fts'
+
+CREATE_TABLE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_SEARCH_TABLE} USING fts5('
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+CREATE_TRIGGERS_SQL = (
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_ai '
+    'AFTER INSERT ON reviews_title BEGIN '
+    f'INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_ad '
+    'AFTER DELETE ON reviews_title BEGIN '
+    f'INSERT INTO {TITLE_SEARCH_TABLE}'
+    f'({TITLE_SEARCH_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_au '
+    'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+    f'INSERT INTO {TITLE_SEARCH_TABLE}'
+    f'({TITLE_SEARCH_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+)
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_au',
+    f'DROP TABLE IF EXISTS {TITLE_SEARCH_TABLE}',
+)
+
+WORD_PATTERN = re.compile(r'\w+')
+# Веса столбцов для bm25: совпадение в названии важнее, чем в описании.
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def is_search_supported(db_connection=connection):
+    return db_connection.vendor == 'sqlite'
+
+
+def _execute(db_connection, *statements):
+    with db_connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_title_search_triggers(db_connection=connection):
+    if is_search_supported(db_connection):
+        _execute(db_connection, *CREATE_TRIGGERS_SQL)
+
+
+def create_title_search(db_connection=connection):
+    if is_search_supported(db_connection):
+        _execute(db_connection, CREATE_TABLE_SQL, *CREATE_TRIGGERS_SQL)
+        rebuild_title_search(db_connection)
+
+
+def drop_title_search(db_connection=connection):
+    if is_search_supported(db_connection):
+        _execute(db_connection, *DROP_SQL)
+
+
+def rebuild_title_search(db_connection=connection):
+    """
+    Перестраивает индекс по текущему содержимому reviews_title.
+    """
+    _execute(
+        db_connection,
+        f"INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}) "
+        "VALUES ('rebuild')",
+    )
+
+
+def check_title_search(db_connection=connection):
+    """
+    Проверяет, что индекс совпадает с reviews_title.
+    Возбуждает DatabaseError, если индекс повреждён.
+    """
+    _execute(
+        db_connection,
+        f"INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}, rank) "
+        "VALUES ('integrity-check', 1)",
+    )
+
+
+def build_match_query(text):
+    """
+    Превращает пользовательский ввод в запрос FTS5: каждое слово
+    ищется как префикс, спецсимволы синтаксиса MATCH отбрасываются.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD_PATTERN.findall(text))
+
+
+def search_titles(queryset, text):
+    """
+    Фильтрует произведения по названию и описанию и упорядочивает
+    их по релевантности (bm25).
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not is_search_supported():
+        return queryset.filter(name__icontains=text)
+    return queryset.extra(
+        tables=[TITLE_SEARCH_TABLE],
+        where=[
+            f'{TITLE_SEARCH_TABLE}.rowid = reviews_title.id',
+            f'{TITLE_SEARCH_TABLE} MATCH %s',
+        ],
+        params=[match],
+        select={'search_rank': (
+            f'bm25({TITLE_SEARCH_TABLE}, '
+            f'{NAME_WEIGHT}, {DESCRIPTION_WEIGHT})'
+        )},
+        order_by=['search_rank'],
+    )
@@ -0,0 +1,234 @@
+import threading
+
+from django.core.signals import request_finished
+from django.db.models import F, Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api_yamdb.cache import invalidate_list_cache
+from users.models import CustomUser
+from .models import Category, Comment, Genre, Review, Title, TitleRanking
+from .utils import (
+    add_score_count,
+    refresh_title_rankings,
+    update_title_rankings
+)
+
+# Произведения и отзывы, которые удаляются сейчас в этом потоке.
+deleting = threading.local()
+
+
+def is_deleting(model, pk):
+    return (model, pk) in getattr(deleting, 'objects', ())
+
+
+@receiver(pre_delete, sender=Title)
+@receiver(pre_delete, sender=Review)
+def mark_deleting(sender, instance, **kwargs):
+    """
+    Отмечает удаляемые произведения и отзывы: при каскадном удалении
+    их отзывов и комментариев счётчики удаляемого родителя
+    не обновляются построчно.
+    """
+    if not hasattr(deleting, 'objects'):
+        deleting.objects = set()
+    deleting.objects.add((sender, instance.pk))
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+def unmark_deleting(sender, instance, **kwargs):
+    # Дочерние строки удаляются и получают сигналы раньше родителя.
+    getattr(deleting, 'objects', set()).discard((sender, instance.pk))
+
+
+@receiver(request_finished)
+def clear_deleting(sender, **kwargs):
+    # Отметки остаются, если удаление прервалось ошибкой.
+    getattr(deleting, 'objects', set()).clear()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """
+    Обновляет счётчики рейтинга и оценок и дату изменения произведения
+    при создании и изменении отзыва.
+    """
+    changes = {'modified': timezone.now()}
+    score_delta = count_delta = 0
+    if created:
+        score_delta, count_delta = instance.score, 1
+    else:
+        loaded_score = getattr(instance, '_loaded_score', None)
+        if loaded_score is not None:
+            score_delta = instance.score - loaded_score
+    if score_delta or count_delta:
+        changes['score_sum'] = F('score_sum') + score_delta
+        changes['reviews_count'] = F('reviews_count') + count_delta
+    Title.objects.filter(pk=instance.title_id).update(**changes)
+    if score_delta or count_delta:
+        update_title_rankings(instance.title_id, score_delta, count_delta)
+        if not created:
+            add_score_count(instance.title_id, loaded_score, -1)
+        add_score_count(instance.title_id, instance.score, 1)
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """
+    Обновляет счётчики рейтинга и оценок произведения при удалении
+    отзыва, в том числе каскадном. Если удаляется само произведение,
+    его счётчики и рейтинговые строки удалятся вместе с ним.
+    """
+    if is_deleting(Title, instance.title_id):
+        return
+    Title.objects.filter(pk=instance.title_id).update(
+        score_sum=F('score_sum') - instance.score,
+        reviews_count=F('reviews_count') - 1,
+        modified=timezone.now(),
+    )
+    update_title_rankings(instance.title_id, -instance.score, -1)
+    add_score_count(instance.title_id, instance.score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def update_review_on_comment_save(sender, instance, created, **kwargs):
+    """
+    Обновляет дату изменения отзыва и счётчик комментариев
+    при создании и изменении комментария. При создании меняется
+    и дата изменения произведения: счётчик комментариев виден
+    в списке отзывов.
+    """
+    now = timezone.now()
+    changes = {'modified': now}
+    if created:
+        changes['comments_count'] = F('comments_count') + 1
+        Title.objects.filter(reviews_title=instance.review_id).update(
+            modified=now
+        )
+    Review.objects.filter(pk=instance.review_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def update_review_on_comment_delete(sender, instance, **kwargs):
+    """
+    Обновляет дату изменения отзыва и произведения и счётчик
+    комментариев при удалении комментария, в том числе каскадном.
+    Если удаляется сам отзыв, обновлять нечего.
+    """
+    if is_deleting(Review, instance.review_id):
+        return
+    now = timezone.now()
+    Title.objects.filter(reviews_title=instance.review_id).update(
+        modified=now
+    )
+    Review.objects.filter(pk=instance.review_id).update(
+        comments_count=F('comments_count') - 1,
+        modified=now,
+    )
+
+
+@receiver(post_save, sender=CustomUser)
+def touch_authored_on_username_change(sender, instance, created, **kwargs):
+    """
+    Обновляет даты изменения отзывов, комментариев и их родителей при
+    смене имени пользователя: имя автора видно в списках и карточках.
+    """
+    loaded_username = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if created or loaded_username in (None, instance.username):
+        return
+    now = timezone.now()
+    Title.objects.filter(reviews_title__author=instance).update(modified=now)
+    Review.objects.filter(
+        Q(author=instance) | Q(comments_review__author=instance)
+    ).update(modified=now)
+    Comment.objects.filter(author=instance).update(modified=now)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_title_on_genre_change(sender, instance, action, pk_set,
+                                reverse, **kwargs):
+    """
+    Обновляет дату изменения произведений при изменении их жанров.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        titles = Title.objects.filter(pk=instance.pk)
+    elif action == 'pre_clear':
+        titles = Title.objects.filter(genre=instance)
+    else:
+        titles = Title.objects.filter(pk__in=pk_set)
+    titles.update(modified=timezone.now())
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_on_delete(sender, instance, **kwargs):
+    """
+    Обновляет дату изменения произведений, у которых удаляются
+    категория или жанр.
+    """
+    field = 'category' if sender is Category else 'genre'
+    Title.objects.filter(**{field: instance}).update(
+        modified=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_list_cache_on_change(sender, **kwargs):
+    """
+    Сбрасывает кешированные списки категорий и жанров при изменении.
+    """
+    invalidate_list_cache(sender)
+
+
+@receiver(post_save, sender=Title)
+def refresh_rankings_on_title_save(sender, instance, created, **kwargs):
+    """
+    Обновляет рейтинговые таблицы при изменении категории произведения.
+    """
+    if not created:
+        refresh_title_rankings([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_rankings_on_genre_change(sender, instance, action, pk_set,
+                                     reverse, **kwargs):
+    """
+    Обновляет рейтинговые таблицы при изменении жанров произведений.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_title_rankings([instance.pk])
+    elif action == 'post_clear':
+        TitleRanking.objects.filter(
+            scope=TitleRanking.Scope.GENRE, scope_id=instance.pk
+        ).delete()
+    else:
+        refresh_title_rankings(pk_set)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def delete_rankings_on_delete(sender, instance, **kwargs):
+    """
+    Удаляет рейтинговую таблицу удаляемых категории или жанра.
+    """
+    scope = (
+        TitleRanking.Scope.CATEGORY if sender is Category
+        else TitleRanking.Scope.GENRE
+    )
+    TitleRanking.objects.filter(scope=scope, scope_id=instance.pk).delete()
@@ -0,0 +1,266 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Prefetch, Sum
+from django.utils import timezone
+
+from .constants import MAX_SCORE, MIN_SCORE, RATING_PRECISION
+from .models import Genre, Review, ScoreCount, Title, TitleRanking
+
+RATING_COUNTER_FIELDS = ('score_sum', 'reviews_count', 'modified')
+
+
+def get_stale_rating_counters():
+    """
+    Возвращает произведения, у которых счётчики рейтинга не совпадают
+    с отзывами. Значения счётчиков в объектах уже исправлены.
+    """
+    titles = Title.objects.annotate(
+        actual_sum=Sum('reviews_title__score'),
+        actual_count=Count('reviews_title'),
+    ).order_by('pk')
+    stale = []
+    for title in titles.iterator():
+        actual = (title.actual_sum or 0, title.actual_count)
+        if (title.score_sum, title.reviews_count) != actual:
+            title.score_sum, title.reviews_count = actual
+            title.modified = timezone.now()
+            stale.append(title)
+    return stale
+
+
+def rebuild_rating_counters(batch_size=500):
+    """
+    Пересчитывает счётчики рейтинга произведений по отзывам.
+    """
+    stale = get_stale_rating_counters()
+    Title.objects.bulk_update(stale, RATING_COUNTER_FIELDS, batch_size)
+    stale_ids = [title.pk for title in stale]
+    for start in range(0, len(stale_ids), batch_size):
+        refresh_title_rankings(stale_ids[start:start + batch_size])
+    return stale
+
+
+def get_stale_comment_counters():
+    """
+    Возвращает отзывы, у которых счётчик комментариев не совпадает
+    с комментариями. Значения счётчиков в объектах уже исправлены.
+    """
+    reviews = Review.objects.annotate(
+        actual_count=Count('comments_review'),
+    ).only('pk', 'comments_count').order_by('pk')
+    stale = []
+    for review in reviews.iterator():
+        if review.comments_count != review.actual_count:
+            review.comments_count = review.actual_count
+            stale.append(review)
+    return stale
+
+
+def rebuild_comment_counters(batch_size=500):
+    """
+    Пересчитывает счётчики комментариев отзывов.
+    """
+    stale = get_stale_comment_counters()
+    Review.objects.bulk_update(stale, ('comments_count',), batch_size)
+    return stale
+
+
+def get_ranked_titles():
+    return Title.objects.filter(reviews_count__gt=0).only(
+        'id', 'category', 'score_sum', 'reviews_count'
+    ).prefetch_related(
+        Prefetch('genre', queryset=Genre.objects.only('id'))
+    ).order_by('pk')
+
+
+def build_title_rankings(titles):
+    """
+    Строки рейтинговых таблиц для произведений: общая таблица,
+    таблица категории и таблицы всех жанров произведения.
+    """
+    rankings = []
+    for title in titles:
+        if not title.reviews_count:
+            continue
+        scopes = [(TitleRanking.Scope.ALL, 0)]
+        if title.category_id:
+            scopes.append((TitleRanking.Scope.CATEGORY, title.category_id))
+        scopes += [
+            (TitleRanking.Scope.GENRE, genre.pk) for genre in title.genre.all()
+        ]
+        rankings += [
+            TitleRanking(
+                scope=scope,
+                scope_id=scope_id,
+                title_id=title.pk,
+                rating=title.rating,
+                rating_key=(
+                    title.score_sum * RATING_PRECISION // title.reviews_count
+                ),
+                score_sum=title.score_sum,
+                reviews_count=title.reviews_count,
+            )
+            for scope, scope_id in scopes
+        ]
+    return rankings
+
+
+def refresh_title_rankings(title_ids):
+    """
+    Пересобирает строки рейтинговых таблиц для указанных произведений.
+    """
+    titles = get_ranked_titles().filter(pk__in=title_ids)
+    with transaction.atomic():
+        TitleRanking.objects.filter(title_id__in=title_ids).delete()
+        TitleRanking.objects.bulk_create(build_title_rankings(titles))
+
+
+def iter_ranked_title_batches(batch_size=500):
+    # iterator() не выполняет prefetch_related, поэтому произведения
+    # читаются пачками по первичному ключу.
+    titles = get_ranked_titles()
+    last_pk = 0
+    while True:
+        batch = list(titles.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+def update_title_rankings(title_id, score_delta, count_delta):
+    """
+    Сдвигает счётчики строк рейтинга произведения на изменение его
+    отзывов без чтения произведения. Строки для первого отзыва
+    собираются по произведению, после последнего отзыва удаляются.
+    """
+    rankings = TitleRanking.objects.filter(title_id=title_id)
+    if count_delta < 0:
+        rankings.filter(reviews_count__lte=-count_delta).delete()
+    score_sum = F('score_sum') + score_delta
+    reviews_count = F('reviews_count') + count_delta
+    updated = rankings.update(
+        score_sum=score_sum,
+        reviews_count=reviews_count,
+        rating=score_sum / reviews_count,
+        rating_key=score_sum * RATING_PRECISION / reviews_count,
+    )
+    if not updated and count_delta > 0:
+        refresh_title_rankings([title_id])
+
+
+def get_actual_rankings():
+    return {
+        (str(ranking.scope), ranking.scope_id, ranking.title_id): (
+            ranking.rating, ranking.rating_key, ranking.score_sum,
+            ranking.reviews_count,
+        )
+        for batch in iter_ranked_title_batches()
+        for ranking in build_title_rankings(batch)
+    }
+
+
+def get_stale_rankings():
+    """
+    Возвращает ключи (таблица, категория или жанр, произведение) строк
+    рейтинговых таблиц, которые расходятся со счётчиками произведений.
+    """
+    actual = get_actual_rankings()
+    stored = {
+        (scope, scope_id, title_id): tuple(counters)
+        for scope, scope_id, title_id, *counters
+        in TitleRanking.objects.values_list(
+            'scope', 'scope_id', 'title_id',
+            'rating', 'rating_key', 'score_sum', 'reviews_count',
+        ).iterator()
+    }
+    return sorted(
+        key for key in actual.keys() | stored.keys()
+        if actual.get(key) != stored.get(key)
+    )
+
+
+def rebuild_rankings(batch_size=500):
+    """
+    Полностью пересобирает рейтинговые таблицы по счётчикам произведений.
+    """
+    TitleRanking.objects.all().delete()
+    for batch in iter_ranked_title_batches(batch_size):
+        TitleRanking.objects.bulk_create(build_title_rankings(batch))
+
+
+def add_score_count(title_id, score, delta):
+    """
+    Сдвигает счётчик отзывов произведения с оценкой score на delta.
+    """
+    counts = ScoreCount.objects.filter(title_id=title_id, score=score)
+    if counts.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            ScoreCount.objects.create(
+                title_id=title_id, score=score, count=delta
+            )
+    except IntegrityError:
+        # Строку успел создать параллельный запрос.
+        counts.update(count=F('count') + delta)
+
+
+def get_score_histograms(title_ids):
+    """
+    Гистограммы оценок существующих произведений одним запросом:
+    {id произведения: {оценка: количество отзывов}}.
+    """
+    histograms = {}
+    rows = Title.objects.filter(pk__in=title_ids).values_list(
+        'pk', 'score_counts__score', 'score_counts__count'
+    )
+    for title_id, score, count in rows:
+        histogram = histograms.setdefault(
+            title_id, dict.fromkeys(range(MIN_SCORE, MAX_SCORE + 1), 0)
+        )
+        if score is not None:
+            histogram[score] = count
+    return histograms
+
+
+def get_actual_score_counts():
+    return {
+        (title_id, score): count
+        for title_id, score, count in Review.objects.values(
+            'title_id', 'score'
+        ).annotate(count=Count('pk')).values_list(
+            'title_id', 'score', 'count'
+        ).order_by().iterator()
+    }
+
+
+def get_stale_score_histograms():
+    """
+    Возвращает id произведений, у которых счётчики оценок не совпадают
+    с отзывами.
+    """
+    actual = get_actual_score_counts()
+    stored = {
+        (title_id, score): count
+        for title_id, score, count in ScoreCount.objects.filter(
+            count__gt=0
+        ).values_list('title_id', 'score', 'count').iterator()
+    }
+    return sorted({
+        title_id for title_id, score in actual.keys() | stored.keys()
+        if actual.get((title_id, score)) != stored.get((title_id, score))
+    })
+
+
+def rebuild_score_histograms(batch_size=500):
+    """
+    Пересчитывает счётчики оценок всех произведений по отзывам.
+    """
+    ScoreCount.objects.all().delete()
+    ScoreCount.objects.bulk_create(
+        (
+            ScoreCount(title_id=title_id, score=score, count=count)
+            for (title_id, score), count in get_actual_score_counts().items()
+        ),
+        batch_size=batch_size,
+    )
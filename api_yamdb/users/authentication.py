@@ -0,0 +1,72 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from api_yamdb.cache import (
+    bump_cache_version,
+    get_cache_version,
+    is_cache_shared
+)
+from .cache import ExpiringLRUCache
+from .constants import TOKEN_CACHE_SIZE, USER_CACHE_TTL
+
+token_cache = ExpiringLRUCache(TOKEN_CACHE_SIZE)
+
+
+def get_user_cache_version_key(user_id):
+    return f'users:auth-version:{user_id}'
+
+
+def get_user_cache_key(user_id, version):
+    return f'users:auth:{user_id}:{version}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Меняет версию пользователя в общем кеше после фиксации транзакции:
+    до фиксации другие процессы всё равно читают из базы старую строку.
+    """
+    transaction.on_commit(
+        lambda: bump_cache_version(get_user_cache_version_key(user_id))
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с кешами.
+    Проверенные токены хранятся в памяти процесса до момента истечения
+    (claim exp), поэтому подпись одного и того же токена проверяется
+    один раз.
+    Пользователь хранится в общем кеше Django не дольше USER_CACHE_TTL
+    секунд под ключом с версией, которая меняется при сохранении или
+    удалении пользователя. Версия читается до загрузки из базы, поэтому
+    запрос, загрузивший строку до смены роли, сохраняет её под старой
+    версией, и во всех процессах следующий запрос видит новую роль.
+    Если кеш Django локален для процесса, пользователь не кешируется.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = token_cache.get(raw_token)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            token_cache.set(
+                raw_token, validated_token,
+                validated_token.get('exp', time.time())
+            )
+        return validated_token
+
+    def get_user(self, validated_token):
+        if not is_cache_shared():
+            return super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        cache_key = get_user_cache_key(
+            user_id, get_cache_version(get_user_cache_version_key(user_id))
+        )
+        user = cache.get(cache_key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(cache_key, user, USER_CACHE_TTL)
+        return user
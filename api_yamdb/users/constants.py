@@ -3,3 +3,12 @@ BIG_LENGTH = 254
 MAX_FOR_EMAIL = 254
 MIN_FOR_EMAIL = 1
 MAX_FOR_USERNAME = 150
+USER_CACHE_TTL = 60
+TOKEN_CACHE_SIZE = 4096
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_WORKERS = 4
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_MAX_RETRY_DELAY = 3600
+OUTBOX_LEASE = 300
+OUTBOX_POLL_INTERVAL = 5
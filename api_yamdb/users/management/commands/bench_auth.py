@@ -0,0 +1,82 @@
+import time
+from unittest import mock
+
+from django.db import transaction
+from django.core.management import BaseCommand
+from django.test import Client
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.cache import bump_cache_version
+from users.authentication import (
+    CachedJWTAuthentication,
+    get_user_cache_version_key,
+    token_cache,
+)
+from users.models import CustomUser
+
+TITLES_URL = '/api/v1/titles/'
+AUTHENTICATION_CLASSES = (JWTAuthentication, CachedJWTAuthentication)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает затраты на аутентификацию JWT без кеша и с кешем '
+        f'для запросов к {TITLES_URL}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Количество запросов в каждом замере.',
+        )
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(
+                username='bench-auth-user', email='bench-auth@yamdb.fake'
+            )
+            token = str(AccessToken.for_user(user))
+            header = f'Bearer {token}'
+            for auth_class in AUTHENTICATION_CLASSES:
+                # Сбрасываются только записи пользователя замера,
+                # общий кеш остальных процессов не затрагивается.
+                token_cache.clear()
+                bump_cache_version(get_user_cache_version_key(user.pk))
+                auth = self.measure_authenticate(auth_class, header, count)
+                full = self.measure_request(auth_class, header, count)
+                self.stdout.write(
+                    f'{auth_class.__name__}: аутентификация {auth:.1f} мкс, '
+                    f'запрос к {TITLES_URL} {full:.1f} мкс'
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure_authenticate(auth_class, header, count):
+        request = APIRequestFactory().get(
+            TITLES_URL, HTTP_AUTHORIZATION=header
+        )
+        authentication = auth_class()
+        started = time.perf_counter()
+        for _ in range(count):
+            authentication.authenticate(request)
+        return (time.perf_counter() - started) / count * 1e6
+
+    @staticmethod
+    def measure_request(auth_class, header, count):
+        client = Client(HTTP_AUTHORIZATION=header)
+        # Представления берут authentication_classes из APIView,
+        # поэтому подмена атрибута меняет аутентификацию во всём API.
+        with mock.patch.object(
+            APIView, 'authentication_classes', (auth_class,)
+        ):
+            client.get(TITLES_URL)
+            started = time.perf_counter()
+            for _ in range(count):
+                client.get(TITLES_URL)
+        return (time.perf_counter() - started) / count * 1e6
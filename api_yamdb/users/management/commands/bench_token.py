@@ -0,0 +1,79 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from users.models import CustomUser
+
+TOKEN_URL = '/api/v1/auth/token/'
+CONFIRMATION_CODE = 'bench1'
+
+
+class Command(BaseCommand):
+    help = (
+        f'Замеряет время ответа {TOKEN_URL} при разном количестве '
+        'пользователей в базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[10_000, 100_000, 1_000_000],
+            help='Количество пользователей для каждого замера.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Количество запросов в каждом замере.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10_000,
+            help='Размер пачки при создании пользователей.',
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        with transaction.atomic():
+            created = 0
+            for size in sorted(options['sizes']):
+                created = self.create_users(
+                    created, size, options['batch_size']
+                )
+                latency = self.measure(client, size - 1, options['requests'])
+                self.stdout.write(
+                    f'Пользователей: {size}, получение токена '
+                    f'{latency:.1f} мкс'
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def create_users(start, stop, batch_size):
+        for offset in range(start, stop, batch_size):
+            CustomUser.objects.bulk_create(
+                CustomUser(
+                    username=f'bench-token-{number}',
+                    email=f'bench-token-{number}@yamdb.fake',
+                    password='!',
+                    confirmation_code=CONFIRMATION_CODE,
+                )
+                for number in range(offset, min(offset + batch_size, stop))
+            )
+        return stop
+
+    @staticmethod
+    def measure(client, number, count):
+        data = {
+            'username': f'bench-token-{number}',
+            'confirmation_code': CONFIRMATION_CODE,
+        }
+        client.post(TOKEN_URL, data=data)
+        started = time.perf_counter()
+        for _ in range(count):
+            client.post(TOKEN_URL, data=data)
+        return (time.perf_counter() - started) / count * 1e6
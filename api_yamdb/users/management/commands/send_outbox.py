@@ -0,0 +1,56 @@
+import time
+
+from django.core.management import BaseCommand
+
+from users.constants import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_WORKERS
+)
+from users.outbox import send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help='Количество писем, забираемых из очереди за раз.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=OUTBOX_WORKERS,
+            help='Количество потоков отправки.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новых писем.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=OUTBOX_POLL_INTERVAL,
+            help='Пауза в секундах между проверками очереди в режиме --loop.',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_outbox_batch(
+                options['batch_size'], options['workers']
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {total_sent}, с ошибкой: {total_failed}'
+        ))
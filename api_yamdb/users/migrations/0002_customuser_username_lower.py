@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 07:26
+
+from django.db import migrations
+import api_yamdb.fields
+
+
+def fill_username_lower(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    users = list(CustomUser.objects.all())
+    for user in users:
+        user.username_lower = user.username.lower()
+    CustomUser.objects.bulk_update(
+        users, ('username_lower',), batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='username_lower',
+            field=api_yamdb.fields.LowercaseCopyField(db_index=True, default='', editable=False, max_length=150, source_field='username', verbose_name='Имя пользователя в нижнем регистре'),
+        ),
+        migrations.RunPython(fill_username_lower, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,9 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
-from .constants import LITTLE_LENGTH, BIG_LENGTH
+from api_yamdb.fields import LowercaseCopyField
+from .constants import LITTLE_LENGTH, BIG_LENGTH, MAX_FOR_USERNAME
 
 
 class CustomUser(AbstractUser):
@@ -27,6 +29,11 @@ class CustomUser(AbstractUser):
         blank=True,
         max_length=LITTLE_LENGTH,
     )
+    username_lower = LowercaseCopyField(
+        'Имя пользователя в нижнем регистре',
+        max_length=MAX_FOR_USERNAME,
+        source_field='username',
+    )
     confirmation_code = models.CharField(
         'confirmation code',
         max_length=LITTLE_LENGTH, blank=True, null=True,
@@ -41,3 +48,39 @@ class CustomUser(AbstractUser):
 
     def __str__(self):
         return self.role
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_username = instance.__dict__.get('username')
+        return instance
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+    """
+
+    recipient = models.EmailField('Получатель', max_length=BIG_LENGTH)
+    subject = models.CharField('Тема', max_length=BIG_LENGTH)
+    message = models.TextField('Текст')
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Дата отправки', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outgoing_email_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
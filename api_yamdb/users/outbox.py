@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .constants import (
+    OUTBOX_LEASE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_MAX_RETRY_DELAY,
+    OUTBOX_RETRY_DELAY
+)
+from .models import OutgoingEmail
+
+OUTBOX_UPDATE_FIELDS = ('attempts', 'sent_at', 'last_error', 'next_attempt_at')
+
+
+def enqueue_email(recipient, subject, message):
+    """
+    Ставит письмо в очередь. Отправляет его команда send_outbox.
+    """
+    return OutgoingEmail.objects.create(
+        recipient=recipient, subject=subject, message=message
+    )
+
+
+def get_pending_emails(now):
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=now,
+        attempts__lt=OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def claim_emails(batch_size):
+    """
+    Забирает пачку писем и откладывает их следующую попытку на время
+    аренды, чтобы параллельно запущенные обработчики их не взяли.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = get_pending_emails(now).order_by('next_attempt_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        emails = list(pending[:batch_size])
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE))
+    return emails
+
+
+def get_retry_delay(attempts):
+    """
+    Экспоненциальная задержка перед следующей попыткой.
+    """
+    delay = OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, OUTBOX_MAX_RETRY_DELAY))
+
+
+def deliver_email(email):
+    """
+    Отправляет письмо и возвращает текст ошибки или None.
+    """
+    try:
+        send_mail(
+            email.subject,
+            email.message,
+            settings.DEFAULT_FROM_EMAIL,
+            [email.recipient],
+        )
+    except Exception as error:
+        return repr(error)
+    return None
+
+
+def send_outbox_batch(batch_size, workers):
+    """
+    Отправляет одну пачку писем в пуле потоков.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    emails = claim_emails(batch_size)
+    if not emails:
+        return 0, 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        errors = list(executor.map(deliver_email, emails))
+    now = timezone.now()
+    failed = 0
+    for email, error in zip(emails, errors):
+        email.attempts += 1
+        if error is None:
+            email.sent_at = now
+            email.last_error = ''
+        else:
+            failed += 1
+            email.last_error = error
+            email.next_attempt_at = now + get_retry_delay(email.attempts)
+    OutgoingEmail.objects.bulk_update(emails, OUTBOX_UPDATE_FIELDS)
+    return len(emails) - failed, failed
@@ -3,6 +3,8 @@ from django.core.validators import (
     MaxLengthValidator,
     RegexValidator
 )
+from django.db.models import Q
+from django.utils.crypto import constant_time_compare
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.validators import UniqueValidator
@@ -40,19 +42,25 @@ class UserSignupSerializer(serializers.ModelSerializer):
         email = data.get('email')
         username = data.get('username')
 
-        if CustomUser.objects.filter(email=email).exists()\
-                and not CustomUser.objects.filter(username=username).exists():
+        if username == 'me':
             raise serializers.ValidationError(
-                'Пользователь с таким email уже существует',
+                'Имя пользователя не может быть "me"!',
             )
-        if CustomUser.objects.filter(username=username).exists() \
-                and not CustomUser.objects.filter(email=email).exists():
+        matches = set(
+            CustomUser.objects.filter(
+                Q(email=email) | Q(username=username)
+            ).values_list('email', 'username')
+        )
+        self.user_exists = (email, username) in matches
+        if self.user_exists:
+            return data
+        if any(match_email == email for match_email, _ in matches):
             raise serializers.ValidationError(
-                'Пользователь с таким username уже существует',
+                'Пользователь с таким email уже существует',
             )
-        if username == 'me':
+        if matches:
             raise serializers.ValidationError(
-                'Имя пользователя не может быть "me"!',
+                'Пользователь с таким username уже существует',
             )
         return data
 
@@ -73,13 +81,18 @@ class CustomUserSignupTokenSerializer(serializers.ModelSerializer):
         confirmation_code = data.get('confirmation_code')
         username = data.get('username')
 
-        if not CustomUser.objects.filter(username=username).exists():
+        try:
+            user = CustomUser.objects.only('pk', 'confirmation_code').get(
+                username=username
+            )
+        except CustomUser.DoesNotExist:
             raise NotFound('User not found')
-        if not CustomUser.objects.filter(
-                confirmation_code=confirmation_code
-        ).exists():
+        if not constant_time_compare(
+                user.confirmation_code or '', confirmation_code
+        ):
             raise ValidationError('Confirmation code not found')
 
+        data['user'] = user
         return data
 
     class Meta:
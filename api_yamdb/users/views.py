@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 
 import jwt
 from django.conf import settings
-from django.core.mail import send_mail
+from django.db import transaction
 from rest_framework import status
 from rest_framework import viewsets
 from rest_framework.decorators import action
@@ -12,7 +12,9 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.views import APIView
 
+from api.mixins import PrefixSearchMixin
 from .models import CustomUser
+from .outbox import enqueue_email
 from .permissions import IsSuperUserOrAdmin
 from .serializers import (
     CustomUserSignupTokenSerializer,
@@ -57,26 +59,23 @@ class SignupAPI(APIView):
                             CustomUser.Role.choices]:
                 return Response(status=status.HTTP_400_BAD_REQUEST)
 
-            if CustomUser.objects.filter(
-                email=email,
-                username=username
-            ).exists():
+            if serializer.user_exists:
                 return Response(serializer.data, status=status.HTTP_200_OK)
 
             confirmation_code = generate_confirmation_code(email)
 
-            CustomUser.objects.create_user(
-                email=email,
-                username=username,
-                confirmation_code=confirmation_code,
-                role=role,
-            )
-            send_mail(
-                'Код подтверждения',
-                f'Ваш код подтверждения: {confirmation_code}',
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
-            )
+            with transaction.atomic():
+                CustomUser.objects.create_user(
+                    email=email,
+                    username=username,
+                    confirmation_code=confirmation_code,
+                    role=role,
+                )
+                enqueue_email(
+                    email,
+                    'Код подтверждения',
+                    f'Ваш код подтверждения: {confirmation_code}',
+                )
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -94,23 +93,13 @@ class CustomUserTokenAPI(APIView):
         if not serializer.is_valid():
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        username = serializer.validated_data['username']
-        confirmation_code = serializer.validated_data['confirmation_code']
-
-        try:
-            user = CustomUser.objects.get(
-                username=username, confirmation_code=confirmation_code
-            )
-        except ValueError:
-            return Response(status=status.HTTP_401_UNAUTHORIZED)
-
-        access_token = AccessToken.for_user(user)
+        access_token = AccessToken.for_user(serializer.validated_data['user'])
         return Response(
             {'token': str(access_token)}, status=status.HTTP_200_OK
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(PrefixSearchMixin, viewsets.ModelViewSet):
     """
     Представления для работы с пользователями.
     """
@@ -120,6 +109,7 @@ class UserViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     filter_backends = [SearchFilter]
     search_fields = ['username']
+    prefix_search_field = 'username_lower'
 
     def get_permissions(self):
         if self.action in (
@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import cache
+
+from users.authentication import token_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    token_cache.clear()
+    yield
+    cache.clear()
+    token_cache.clear()
@@ -1,7 +1,10 @@
 from http import HTTPStatus
+from io import StringIO
+from unittest import mock
 
 import pytest
 from django.core import mail
+from django.core.management import call_command
 from django.db.utils import IntegrityError
 
 from tests.utils import (
@@ -112,6 +115,11 @@ class Test00UserRegistration:
         }
 
         response = client.post(self.URL_SIGNUP, data=valid_data)
+        assert len(mail.outbox) == outbox_before_count, (
+            f'POST-запрос к эндпоинту `{self.URL_SIGNUP}` не должен ждать '
+            'отправки письма: письмо ставится в очередь исходящих писем.'
+        )
+        call_command('send_outbox', stdout=StringIO())
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -375,3 +383,104 @@ class Test00UserRegistration:
             'пользователя, созданного администратором,  возвращает ответ '
             'со статусом 200.'
         )
+
+    def test_signup_email_retried_with_backoff(self, client):
+        from django.utils import timezone
+
+        from users.models import OutgoingEmail
+
+        outbox_before_count = len(mail.outbox)
+        valid_data = {
+            'email': 'retry@yamdb.fake',
+            'username': 'retry_username'
+        }
+        response = client.post(self.URL_SIGNUP, data=valid_data)
+        assert response.status_code == HTTPStatus.OK
+        email = OutgoingEmail.objects.get(recipient=valid_data['email'])
+
+        with mock.patch(
+            'users.outbox.send_mail', side_effect=ConnectionError
+        ):
+            call_command('send_outbox', stdout=StringIO())
+        email.refresh_from_db()
+        assert email.sent_at is None and email.attempts == 1, (
+            'Проверьте, что неудачная отправка письма учитывается как '
+            'попытка, а письмо остаётся в очереди.'
+        )
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная отправка письма откладывается.'
+        )
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count
+
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=timezone.now()
+        )
+        call_command('send_outbox', stdout=StringIO())
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 2
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert valid_data['email'] in mail.outbox[-1].to
+
+    @pytest.mark.parametrize('data,status_code,queries', [
+        # SELECT, BEGIN и вставки пользователя и письма в очередь.
+        ({'email': 'new@yamdb.fake', 'username': 'new_user'},
+         HTTPStatus.OK, 4),
+        ({'email': 'taken@yamdb.fake', 'username': 'taken_user'},
+         HTTPStatus.OK, 1),
+        ({'email': 'taken@yamdb.fake', 'username': 'other_user'},
+         HTTPStatus.BAD_REQUEST, 1),
+        ({'email': 'other@yamdb.fake', 'username': 'taken_user'},
+         HTTPStatus.BAD_REQUEST, 1),
+        ({'email': 'taken@yamdb.fake', 'username': 'second_user'},
+         HTTPStatus.BAD_REQUEST, 1),
+        ({'email': 'me@yamdb.fake', 'username': 'me'},
+         HTTPStatus.BAD_REQUEST, 0),
+    ])
+    def test_signup_single_user_lookup(self, client, django_user_model,
+                                       django_assert_num_queries,
+                                       data, status_code, queries):
+        django_user_model.objects.create_user(
+            username='taken_user', email='taken@yamdb.fake'
+        )
+        django_user_model.objects.create_user(
+            username='second_user', email='second@yamdb.fake'
+        )
+        users_count = django_user_model.objects.count()
+
+        with django_assert_num_queries(queries):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == status_code, (
+            f'Проверьте ответ эндпоинта `{self.URL_SIGNUP}` для данных '
+            f'{data}.'
+        )
+        created = int(queries == 4)
+        assert django_user_model.objects.count() == users_count + created
+
+    def test_token_single_user_lookup(self, client, django_user_model,
+                                      django_assert_num_queries):
+        django_user_model.objects.create_user(
+            username='token_user', email='token@yamdb.fake',
+            confirmation_code='abc123'
+        )
+        django_user_model.objects.create_user(
+            username='other_user', email='other@yamdb.fake',
+            confirmation_code='xyz789'
+        )
+        cases = (
+            ({'username': 'token_user', 'confirmation_code': 'abc123'},
+             HTTPStatus.OK),
+            ({'username': 'token_user', 'confirmation_code': 'xyz789'},
+             HTTPStatus.BAD_REQUEST),
+            ({'username': 'missing_user', 'confirmation_code': 'abc123'},
+             HTTPStatus.NOT_FOUND),
+        )
+        for data, status_code in cases:
+            with django_assert_num_queries(1):
+                response = client.post(self.URL_TOKEN, data=data)
+            assert response.status_code == status_code, (
+                f'Проверьте ответ эндпоинта `{self.URL_TOKEN}` для данных '
+                f'{data}: код подтверждения должен проверяться для '
+                'указанного пользователя одним запросом к базе.'
+            )
+        assert 'token' in client.post(self.URL_TOKEN, data=cases[0][0]).json()
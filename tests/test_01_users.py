@@ -564,3 +564,126 @@ class Test01UserAPI:
             f'Проверьте, что PATCH-запрос к `{self.USERS_ME_URL}` с ключом '
             '`role` не изменяет роль пользователя.'
         )
+
+    def test_11_users_prefix_search(self, admin_client, admin, user,
+                                    moderator, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = admin_client.get(
+                f'{self.USERS_URL}?prefix=testm&limit=5'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            found['username'] for found in response.json()
+        ] == [moderator.username], (
+            f'Проверьте, что параметр `prefix` эндпоинта `{self.USERS_URL}` '
+            'ищет пользователей по началу имени без учёта регистра.'
+        )
+
+        response = admin_client.get(f'{self.USERS_URL}?prefix=TEST&limit=2')
+        assert [found['username'] for found in response.json()] == [
+            admin.username, moderator.username
+        ], (
+            f'Проверьте, что параметр `prefix` эндпоинта `{self.USERS_URL}` '
+            'возвращает первые `limit` совпадений по алфавиту.'
+        )
+
+    def test_12_users_cached_authentication(self, admin_client, user,
+                                            user_client,
+                                            django_assert_num_queries):
+        response = user_client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = user_client.get(self.USERS_ME_URL)
+        assert response.json()['username'] == user.username, (
+            'Проверьте, что повторный запрос с тем же токеном не загружает '
+            'пользователя из базы.'
+        )
+
+        response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после смены роли пользователя кеш '
+            'аутентификации сбрасывается.'
+        )
+
+        user.delete()
+        response = user_client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удалённый пользователь не проходит '
+            'аутентификацию из кеша.'
+        )
+
+    def test_13_users_verified_token_cache(self, user, user_client,
+                                           token_user):
+        from datetime import timedelta
+        from unittest import mock
+
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from users.authentication import token_cache
+
+        user_client.get(self.USERS_ME_URL)
+        with mock.patch.object(
+            AccessToken, 'verify', side_effect=AssertionError
+        ):
+            response = user_client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторно предъявленный токен не проверяется '
+            'заново, а берётся из кеша проверенных токенов.'
+        )
+        assert token_cache.get(token_user['access'].encode()) is not None
+
+        expired = AccessToken.for_user(user)
+        expired.set_exp(lifetime=-timedelta(seconds=1))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {expired}')
+        response = client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert token_cache.get(str(expired).encode()) is None
+
+    def test_14_users_cached_authentication_race(self, user, user_client):
+        from unittest import mock
+
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+
+        load_user = JWTAuthentication.get_user
+
+        def load_and_promote(authentication, validated_token):
+            # Строка прочитана до смены роли, а сохранена в кеш после.
+            stale_user = load_user(authentication, validated_token)
+            user.role = 'admin'
+            user.save()
+            return stale_user
+
+        with mock.patch.object(
+            JWTAuthentication, 'get_user', load_and_promote
+        ):
+            response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь, загруженный из базы до смены '
+            'роли, не сохраняется в кеше аутентификации после неё.'
+        )
+
+    def test_15_users_not_cached_in_process_memory(self, user_client,
+                                                   settings,
+                                                   django_assert_num_queries):
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }
+        }
+        user_client.get(self.USERS_ME_URL)
+        with django_assert_num_queries(1):
+            response = user_client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь не кешируется, если кеш Django '
+            'локален для процесса: смену роли в другом процессе такой кеш '
+            'не увидит.'
+        )
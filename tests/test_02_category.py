@@ -153,3 +153,93 @@ class Test02CategoryAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, self.CATEGORY_URL, data,
                           'модератора', categories, HTTPStatus.FORBIDDEN)
+
+    def test_06_category_list_cache(self, client, admin_client,
+                                    django_assert_num_queries):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        categories = create_categories(admin_client)
+        search_url = f'{self.CATEGORY_URL}?search={categories[0]["name"]}'
+        client.get(self.CATEGORY_URL)
+        client.get(search_url)
+        with django_assert_num_queries(0):
+            response = client.get(self.CATEGORY_URL)
+        check_pagination(self.CATEGORY_URL, response.json(), 2)
+        with django_assert_num_queries(0):
+            response = client.get(search_url)
+        check_pagination(self.CATEGORY_URL, response.json(), 1)
+
+        data = {'name': 'Музыка', 'slug': 'music'}
+        admin_client.post(self.CATEGORY_URL, data=data)
+        response = client.get(self.CATEGORY_URL)
+        check_pagination(self.CATEGORY_URL, response.json(), 3, data)
+
+        admin_client.delete(
+            self.CATEGORY_SLUG_TEMPLATE_URL.format(slug=data['slug'])
+        )
+        response = client.get(self.CATEGORY_URL)
+        assert data not in response.json()['results'], (
+            f'Проверьте, что после удаления категории кеш списка '
+            f'`{self.CATEGORY_URL}` сбрасывается.'
+        )
+
+        call_command(
+            'generate_data', '--scale', '0.001', stdout=StringIO()
+        )
+        response = client.get(self.CATEGORY_URL)
+        assert response.json()['count'] == 3, (
+            f'Проверьте, что после пакетной загрузки категорий кеш списка '
+            f'`{self.CATEGORY_URL}` сбрасывается.'
+        )
+
+    def test_06_01_category_list_not_cached_in_process_memory(
+        self, client, admin_client, settings, django_assert_num_queries
+    ):
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }
+        }
+        create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+        with django_assert_num_queries(2):
+            response = client.get(self.CATEGORY_URL)
+        check_pagination(self.CATEGORY_URL, response.json(), 2)
+
+    def test_07_category_prefix_search(self, client, admin_client):
+        create_categories(admin_client)
+        admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Фильмотека', 'slug': 'library'}
+        )
+        response = client.get(f'{self.CATEGORY_URL}?prefix=фил')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {'name': 'Фильм', 'slug': 'films'},
+            {'name': 'Фильмотека', 'slug': 'library'},
+        ], (
+            f'Проверьте, что параметр `prefix` эндпоинта `{self.CATEGORY_URL}`'
+            ' ищет категории по началу названия без учёта регистра.'
+        )
+        response = client.get(f'{self.CATEGORY_URL}?prefix=фил&limit=1')
+        assert len(response.json()) == 1
+
+        admin_client.post(
+            self.CATEGORY_URL,
+            data={'name': 'Фил\U0010ffffм', 'slug': 'max-code-point'}
+        )
+        for prefix, expected in (
+            ('%F4%8F%BF%BF', []),
+            ('%D1%84%D0%B8%D0%BB%F4%8F%BF%BF', ['Фил\U0010ffffм']),
+            ('%ED%9F%BF', []),
+        ):
+            response = client.get(f'{self.CATEGORY_URL}?prefix={prefix}')
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что параметр `prefix` эндпоинта '
+                f'`{self.CATEGORY_URL}` принимает символы с наибольшими '
+                'кодами.'
+            )
+            assert [
+                category['name'] for category in response.json()
+            ] == expected
@@ -136,3 +136,16 @@ class Test03GenreAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, self.GENRES_URL, data,
                           'модератора', genres, HTTPStatus.FORBIDDEN)
+
+    def test_06_genres_list_cache(self, client, admin_client,
+                                  django_assert_num_queries):
+        create_genre(admin_client)
+        client.get(self.GENRES_URL)
+        with django_assert_num_queries(0):
+            response = client.get(self.GENRES_URL)
+        check_pagination(self.GENRES_URL, response.json(), 3)
+
+        data = {'name': 'Боевик', 'slug': 'action'}
+        admin_client.post(self.GENRES_URL, data=data)
+        response = client.get(self.GENRES_URL)
+        check_pagination(self.GENRES_URL, response.json(), 4, data)
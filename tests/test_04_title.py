@@ -4,7 +4,7 @@ import pytest
 
 from tests.utils import (
     check_pagination, check_permissions, create_categories, create_genre,
-    create_titles
+    create_single_review, create_titles
 )
 
 
@@ -353,3 +353,262 @@ class Test04TitleAPI:
             f'Проверьте, что PUT-запрос к `{self.TITLES_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_titles_query_budget(self, client, admin_client,
+                                    django_assert_max_num_queries):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        for idx in range(30):
+            copy = Title.objects.create(
+                name=f'{title.name} {idx}',
+                year=title.year,
+                category=title.category,
+            )
+            copy.genre.set(title.genre.all())
+
+        for limit in (5, 30):
+            with django_assert_max_num_queries(3):
+                response = client.get(f'{self.TITLES_URL}?limit={limit}')
+            assert len(response.json()['results']) == limit, (
+                f'Проверьте, что `{self.TITLES_URL}` загружает категории и '
+                'жанры произведений фиксированным числом запросов.'
+            )
+
+        with django_assert_max_num_queries(3):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.pk)
+            )
+        assert len(response.json()['genre']) == 2, (
+            f'Проверьте, что `{self.TITLES_DETAIL_URL_TEMPLATE}` загружает '
+            'категорию и жанры произведения фиксированным числом запросов.'
+        )
+
+    def test_08_titles_cursor_pagination(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(10)
+        )
+        ids = []
+        next_url = f'{self.TITLES_URL}?cursor=&limit=5'
+        while next_url:
+            data = client.get(next_url).json()
+            ids.extend(title['id'] for title in data['results'])
+            next_url = data['next']
+        assert ids == sorted(Title.objects.values_list('id', flat=True)), (
+            f'Проверьте, что курсорная пагинация `{self.TITLES_URL}` '
+            'возвращает все произведения по порядку `id`.'
+        )
+
+    def test_09_titles_full_text_search(self, client, admin_client):
+        from django.core.management import call_command
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.create(
+            name='Орешек знаний', year=2001,
+            description='Крепкий орешек по версии учебника'
+        )
+        response = client.get(f'{self.TITLES_URL}?q=крепк ОРЕШ')
+        assert response.status_code == HTTPStatus.OK
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Крепкий орешек', 'Орешек знаний'], (
+            f'Проверьте, что параметр `q` эндпоинта `{self.TITLES_URL}` '
+            'ищет по названию и описанию и сортирует результаты '
+            'по релевантности.'
+        )
+
+        admin_client.patch(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id']),
+            data={'name': 'Die Hard'}
+        )
+        Title.objects.filter(name='Орешек знаний').delete()
+        response = client.get(f'{self.TITLES_URL}?q=орешек')
+        assert response.json()['results'] == [], (
+            'Проверьте, что полнотекстовый индекс обновляется при изменении '
+            'и удалении произведений.'
+        )
+        response = client.get(f'{self.TITLES_URL}?q=die')
+        check_pagination(self.TITLES_URL, response.json(), 1)
+
+        response = client.get(f'{self.TITLES_URL}?q="*:(')
+        assert response.status_code == HTTPStatus.OK
+
+        call_command('rebuild_title_search')
+        call_command('rebuild_title_search', '--check')
+
+    def test_10_titles_year_filters(self, client, admin_client):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        Title.objects.create(name='Сияние', year=1980)
+        Title.objects.create(name='Год 19', year=19)
+        for query, expected in (
+            ('year=19', {'Год 19'}),
+            ('year=1984', {'Терминатор'}),
+            ('year_min=1981', {'Терминатор', 'Крепкий орешек'}),
+            ('year_min=1980&year_max=1987', {'Сияние', 'Терминатор'}),
+        ):
+            response = client.get(f'{self.TITLES_URL}?{query}')
+            names = {title['name'] for title in response.json()['results']}
+            assert names == expected, (
+                f'Проверьте, что фильтр `?{query}` эндпоинта '
+                f'`{self.TITLES_URL}` сравнивает год выпуска как число.'
+            )
+        for query in (
+            'year=19.5', 'year=99999999999999999999',
+            'year_min=-99999999999999999999', 'year_max=2147483648',
+        ):
+            response = client.get(f'{self.TITLES_URL}?{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что фильтр `?{query}` эндпоинта '
+                f'`{self.TITLES_URL}` возвращает ответ со статусом 400.'
+            )
+
+    def test_11_titles_category_and_genre_filters(self, client,
+                                                  admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Зловещие мертвецы',
+            'year': 1981,
+            'genre': [genres[0]['slug'], genres[2]['slug']],
+            'category': categories[0]['slug'],
+        })
+        horror, comedy, drama = (genre['slug'] for genre in genres)
+        for query, expected in (
+            (f'genre={horror}', {'Терминатор', 'Зловещие мертвецы'}),
+            (f'genre={horror},{drama}', {
+                'Терминатор', 'Крепкий орешек', 'Зловещие мертвецы'
+            }),
+            (f'genre={horror},{comedy}&genre_mode=all', {'Терминатор'}),
+            (f'genre={horror},unknown&genre_mode=all', set()),
+            (f'genre={horror[:3]}', set()),
+            (f'category={categories[0]["slug"]}', {
+                'Терминатор', 'Зловещие мертвецы'
+            }),
+            (f'category={categories[0]["slug"]}&genre={drama}', {
+                'Зловещие мертвецы'
+            }),
+        ):
+            response = client.get(f'{self.TITLES_URL}?{query}')
+            data = response.json()
+            names = [title['name'] for title in data['results']]
+            assert len(names) == data['count'] and set(names) == expected, (
+                f'Проверьте, что фильтр `?{query}` эндпоинта '
+                f'`{self.TITLES_URL}` точно сравнивает слаги и не '
+                'дублирует произведения.'
+            )
+
+    def test_12_titles_leaderboards(self, client, admin_client, user_client,
+                                    moderator_client,
+                                    django_assert_num_queries):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from reviews.models import TitleRanking
+
+        titles, categories, genres = create_titles(admin_client)
+        terminator, die_hard = (title['id'] for title in titles)
+        create_single_review(user_client, terminator, 'text', 4)
+        create_single_review(moderator_client, terminator, 'text', 6)
+        review = create_single_review(admin_client, die_hard, 'text', 9)
+        top_url = f'{self.TITLES_URL}top/'
+
+        def get_top(query=''):
+            with django_assert_num_queries(1):
+                response = client.get(f'{top_url}?{query}')
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{top_url}?{query}` '
+                'возвращает ответ со статусом 200.'
+            )
+            return [
+                (title['id'], title['rating'], title['reviews_count'])
+                for title in response.json()
+            ]
+
+        assert get_top() == [(die_hard, 9, 1), (terminator, 5, 2)], (
+            f'Проверьте, что `{top_url}` возвращает произведения '
+            'по убыванию рейтинга одним запросом к базе.'
+        )
+        assert get_top('order=reviews') == [
+            (terminator, 5, 2), (die_hard, 9, 1)
+        ]
+        assert get_top('limit=1') == [(die_hard, 9, 1)]
+        assert get_top(f'category={categories[0]["slug"]}') == [
+            (terminator, 5, 2)
+        ]
+        assert get_top(f'genre={genres[2]["slug"]}') == [(die_hard, 9, 1)]
+        assert get_top('genre=unknown') == []
+        for query in (
+            f'category={categories[0]["slug"]}&genre={genres[0]["slug"]}',
+            'order=unknown',
+        ):
+            response = client.get(f'{top_url}?{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        review_url = (
+            f'{self.TITLES_URL}{die_hard}/reviews/{review.json()["id"]}/'
+        )
+        admin_client.patch(review_url, data={'text': 'text', 'score': 1})
+        assert get_top() == [(terminator, 5, 2), (die_hard, 1, 1)], (
+            'Проверьте, что рейтинговые таблицы обновляются при изменении '
+            'оценки отзыва.'
+        )
+        admin_client.delete(review_url)
+        assert get_top() == [(terminator, 5, 2)]
+
+        admin_client.patch(
+            f'{self.TITLES_URL}{terminator}/',
+            data={'genre': [genres[2]['slug']]}
+        )
+        assert get_top(f'genre={genres[0]["slug"]}') == []
+        assert get_top(f'genre={genres[2]["slug"]}') == [(terminator, 5, 2)]
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        assert get_top(f'category={categories[0]["slug"]}') == []
+
+        call_command('refresh_rankings', '--check', stdout=StringIO())
+        TitleRanking.objects.all().delete()
+        call_command('refresh_rankings', stdout=StringIO())
+        assert get_top() == [(terminator, 5, 2)], (
+            'Проверьте, что команда `refresh_rankings` пересобирает '
+            'рейтинговые таблицы.'
+        )
+        admin_client.delete(f'{self.TITLES_URL}{terminator}/')
+        assert get_top() == []
+        call_command('refresh_rankings', '--check', stdout=StringIO())
+
+    def test_13_titles_internal_fields_not_filterable(self, client,
+                                                      admin_client):
+        create_titles(admin_client)
+        total = client.get(self.TITLES_URL).json()['count']
+        for query in ('score_sum=5', 'reviews_count=5', 'modified=abc'):
+            response = client.get(f'{self.TITLES_URL}?{query}')
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['count'] == total, (
+                f'Проверьте, что параметр `?{query}` эндпоинта '
+                f'`{self.TITLES_URL}` не фильтрует произведения по '
+                'служебным полям.'
+            )
+
+    def test_14_titles_leaderboard_fractional_rating(self, client,
+                                                     admin_client,
+                                                     user_client,
+                                                     moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = (title['id'] for title in titles)
+        for author_client, score in ((user_client, 9), (admin_client, 10)):
+            create_single_review(author_client, terminator, 'text', score)
+        for author_client in (user_client, admin_client, moderator_client):
+            create_single_review(author_client, die_hard, 'text', 9)
+        response = client.get(f'{self.TITLES_URL}top/')
+        assert [
+            (title['id'], title['rating'], title['reviews_count'])
+            for title in response.json()
+        ] == [(terminator, 9, 2), (die_hard, 9, 3)], (
+            f'Проверьте, что `{self.TITLES_URL}top/` сортирует произведения '
+            'по точной средней оценке: 9,5 выше, чем 9,0.'
+        )
@@ -413,3 +413,420 @@ class Test05ReviewAPI:
             f'Проверьте, что PUT-запрос к `{self.REVIEW_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_rating_counters(self, client, admin_client, admin,
+                                user_client, user, moderator_client,
+                                moderator):
+        from django.core.management import call_command
+        from reviews.models import Title
+
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count) == (15, 3), (
+            'Проверьте, что при создании отзыва обновляются счётчики '
+            'рейтинга произведения.'
+        )
+
+        admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            ),
+            data={'text': 'new text', 'score': 9}
+        )
+        assert client.get(title_url).json().get('rating') == 6, (
+            'Проверьте, что при изменении оценки отзыва пересчитывается '
+            'рейтинг произведения.'
+        )
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            )
+        )
+        assert client.get(title_url).json().get('rating') == 5, (
+            'Проверьте, что при удалении отзыва пересчитывается '
+            'рейтинг произведения.'
+        )
+
+        user.delete()
+        moderator.delete()
+        assert client.get(title_url).json().get('rating') is None, (
+            'Проверьте, что при каскадном удалении отзывов пересчитывается '
+            'рейтинг произведения.'
+        )
+        call_command('recount_ratings', '--check')
+
+        Title.objects.filter(pk=titles[0]['id']).update(
+            score_sum=100, reviews_count=7
+        )
+        call_command('recount_ratings')
+        call_command('recount_ratings', '--check')
+
+    def test_08_reviews_query_budget(self, client, admin_client,
+                                     django_user_model,
+                                     django_assert_max_num_queries):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            for idx in range(100)
+        )
+        authors = django_user_model.objects.filter(
+            username__startswith='reviewer'
+        )
+        Review.objects.bulk_create(
+            Review(title_id=titles[0]['id'], author=author, text='text',
+                   score=5)
+            for author in authors
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with django_assert_max_num_queries(3):
+            response = client.get(f'{url}?limit=100')
+        results = response.json()['results']
+        assert len(results) == 100 and all(
+            review['author'].startswith('reviewer') for review in results
+        ), (
+            f'Проверьте, что `{self.REVIEWS_URL_TEMPLATE}` загружает авторов '
+            'отзывов тем же запросом, что и сами отзывы.'
+        )
+
+    def test_09_reviews_cursor_pagination(self, client, admin_client,
+                                          django_user_model):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            for idx in range(25)
+        )
+        Review.objects.bulk_create(
+            Review(title_id=titles[0]['id'], author=author, text='text',
+                   score=5)
+            for author in django_user_model.objects.all()
+        )
+        expected = list(
+            Review.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert 'count' in client.get(url).json(), (
+            f'Проверьте, что по умолчанию `{self.REVIEWS_URL_TEMPLATE}` '
+            'использует пагинацию limit/offset.'
+        )
+
+        pages = []
+        next_url = f'{url}?cursor=&limit=7'
+        while next_url:
+            response = client.get(next_url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data
+            pages.append([review['id'] for review in data['results']])
+            next_url = data['next']
+        assert sum(pages, []) == expected, (
+            f'Проверьте, что курсорная пагинация `{self.REVIEWS_URL_TEMPLATE}`'
+            ' возвращает все отзывы по порядку и без повторов.'
+        )
+
+        previous_pages = []
+        previous_url = data['previous']
+        while previous_url:
+            data = client.get(previous_url).json()
+            previous_pages.insert(
+                0, [review['id'] for review in data['results']]
+            )
+            previous_url = data['previous']
+        assert previous_pages == pages[:-1], (
+            'Проверьте, что ссылка `previous` курсорной пагинации '
+            'возвращает предыдущую страницу.'
+        )
+
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_10_reviews_conditional_get(self, client, admin_client, admin,
+                                        user_client, user,
+                                        django_assert_num_queries):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        urls = (
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']
+            ),
+        )
+        etags = {}
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            etags[url] = response['ETag']
+            assert response.has_header('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок `Last-Modified`.'
+            )
+            with django_assert_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-Modified-Since` возвращает ответ со статусом 304.'
+            )
+
+        user_client.patch(urls[2], data={'text': 'new text', 'score': 1})
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после изменения отзыва GET-запрос к `{url}` '
+                'со старым `If-None-Match` возвращает актуальные данные.'
+            )
+
+    def test_11_review_create_single_title_lookup(self, admin_client,
+                                                  user_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, _, _ = create_titles(admin_client)
+        # Первый отзыв строит строки рейтинговых таблиц по произведению,
+        # следующие только сдвигают их счётчики.
+        create_single_review(admin_client, titles[0]['id'], 'text', 7)
+        with CaptureQueriesContext(connection) as context:
+            create_single_review(user_client, titles[0]['id'], 'text', 5)
+        title_lookups = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_lookups) == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            f'из базы один раз. Запросы: {title_lookups}'
+        )
+
+    def test_12_review_concurrent_duplicates(self, admin_client, user,
+                                             user_client, token_user):
+        import threading
+
+        from django.db import connection
+        from rest_framework.test import APIClient
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = user_client.post(url, data={'text': 'first', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        response = user_client.post(url, data={'text': 'again', 'score': 5})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный POST-запрос пользователя к '
+            f'`{self.REVIEWS_URL_TEMPLATE}` возвращает ответ со статусом 400.'
+        )
+        assert 'non_field_errors' in response.json()
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        threads_count = 8
+        barrier = threading.Barrier(threads_count)
+        statuses = []
+
+        def post_review(number):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+            )
+            try:
+                barrier.wait()
+                response = client.post(
+                    url, data={'text': f'review {number}', 'score': number}
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=post_review, args=(number,))
+            for number in range(1, threads_count + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(statuses) == (
+            [HTTPStatus.CREATED] + [HTTPStatus.BAD_REQUEST]
+            * (threads_count - 1)
+        ), (
+            'Проверьте, что из одновременных POST-запросов одного '
+            f'пользователя к `{self.REVIEWS_URL_TEMPLATE}` создаётся '
+            f'ровно один отзыв. Статусы ответов: {statuses}'
+        )
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert Review.objects.filter(title=title, author=user).count() == 1
+        assert title.reviews_count == 1
+
+    def test_13_review_score_histograms(self, client, admin_client,
+                                        user_client, moderator_client,
+                                        django_assert_num_queries):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'text', 4)
+        create_single_review(moderator_client, title_id, 'text', 4)
+        review = create_single_review(admin_client, title_id, 'text', 9)
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+
+        def expected(**counts):
+            histogram = {str(score): 0 for score in range(1, 11)}
+            histogram.update(counts)
+            return histogram
+
+        response = client.get(detail_url)
+        assert 'score_histogram' not in response.json(), (
+            'Проверьте, что гистограмма оценок добавляется в ответ '
+            'только по запросу `?histogram=1`.'
+        )
+        response = client.get(f'{detail_url}?histogram=1')
+        assert response.json()['score_histogram'] == expected(
+            **{'4': 2, '9': 1}
+        ), (
+            f'Проверьте, что GET-запрос к `{detail_url}?histogram=1` '
+            'возвращает количество отзывов с каждой оценкой от 1 до 10.'
+        )
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review.json()['id']
+        )
+        admin_client.patch(review_url, data={'text': 'text', 'score': 4})
+        response = client.get(f'{detail_url}?histogram=1')
+        assert response.json()['score_histogram'] == expected(**{'4': 3}), (
+            'Проверьте, что гистограмма оценок обновляется при изменении '
+            'оценки отзыва.'
+        )
+        admin_client.delete(review_url)
+
+        histograms_url = '/api/v1/titles/histograms/'
+        with django_assert_num_queries(1):
+            response = client.get(
+                f'{histograms_url}?ids={title_id},{titles[1]["id"]},999'
+            )
+        assert response.json() == {
+            str(title_id): expected(**{'4': 2}),
+            str(titles[1]['id']): expected(),
+        }, (
+            f'Проверьте, что `{histograms_url}?ids=...` возвращает '
+            'гистограммы существующих произведений одним запросом к базе.'
+        )
+        for ids in ('1,a', '0', '-1', '99999999999999999999'):
+            response = client.get(f'{histograms_url}?ids={ids}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{histograms_url}?ids={ids}` возвращает '
+                'ответ со статусом 400.'
+            )
+        call_command('recount_ratings', '--check', stdout=StringIO())
+
+    def test_14_review_concurrent_score_updates(self, admin_client,
+                                                user_client, user):
+        from unittest import mock
+
+        from django.core.management import call_command
+
+        from api.views import ReviewViewSet
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'text', 5
+        ).json()
+        get_object = ReviewViewSet.get_object
+
+        def get_stale_object(view):
+            # Отзыв прочитан до того, как параллельный запрос
+            # изменил оценку.
+            stale_review = get_object(view)
+            concurrent = Review.objects.get(pk=stale_review.pk)
+            concurrent.score = 9
+            concurrent.save()
+            return stale_review
+
+        with mock.patch.object(ReviewViewSet, 'get_object', get_stale_object):
+            response = user_client.patch(
+                self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id'], review_id=review['id']
+                ),
+                data={'text': 'new text', 'score': 1}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert Review.objects.get(pk=review['id']).score == 1
+        # Счётчики, гистограммы и рейтинговые таблицы совпадают
+        # с пересчётом по отзывам.
+        call_command('recount_ratings', '--check')
+        call_command('refresh_rankings', '--check')
+
+    def test_15_title_delete_query_budget(self, admin_client,
+                                          django_user_model,
+                                          django_assert_max_num_queries):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from reviews.models import Comment, Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            for idx in range(30)
+        )
+        authors = django_user_model.objects.filter(
+            username__startswith='reviewer'
+        )
+        for title_id in (titles[0]['id'], titles[1]['id']):
+            for author in authors:
+                review = Review.objects.create(
+                    title_id=title_id, author=author, text='text', score=7
+                )
+                Comment.objects.create(
+                    review=review, author=author, text='text'
+                )
+        # Запросы не зависят от количества отзывов и комментариев
+        # удаляемого произведения.
+        with django_assert_max_num_queries(20):
+            response = admin_client.delete(
+                f'/api/v1/titles/{titles[0]["id"]}/'
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Title.objects.filter(pk=titles[0]['id']).exists()
+
+        review = Review.objects.filter(title_id=titles[1]['id']).first()
+        with django_assert_max_num_queries(20):
+            response = admin_client.delete(
+                f'/api/v1/titles/{titles[1]["id"]}/reviews/{review.pk}/'
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        # Удаление отзыва без произведения обновляет его счётчики.
+        for command in (
+            'recount_ratings', 'recount_comments', 'refresh_rankings'
+        ):
+            call_command(command, '--check', stdout=StringIO())
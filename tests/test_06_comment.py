@@ -1,6 +1,7 @@
 from http import HTTPStatus
 
 import pytest
+from django.core.management import CommandError
 
 from tests.utils import (check_fields, check_pagination, create_comments,
                          create_reviews, create_single_comment)
@@ -366,3 +367,286 @@ class Test06CommentAPI:
             f'Проверьте, что PUT-запрос к `{self.COMMENT_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_08_comments_query_budget(self, client, admin_client, admin,
+                                      django_user_model,
+                                      django_assert_max_num_queries):
+        from reviews.models import Comment
+
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'commenter{idx}',
+                email=f'commenter{idx}@yamdb.fake'
+            )
+            for idx in range(100)
+        )
+        authors = django_user_model.objects.filter(
+            username__startswith='commenter'
+        )
+        Comment.objects.bulk_create(
+            Comment(review_id=reviews[0]['id'], author=author, text='text')
+            for author in authors
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        with django_assert_max_num_queries(3):
+            response = client.get(f'{url}?limit=100')
+        results = response.json()['results']
+        assert len(results) == 100 and all(
+            comment['author'].startswith('commenter') for comment in results
+        ), (
+            f'Проверьте, что `{self.COMMENTS_URL_TEMPLATE}` загружает авторов '
+            'комментариев тем же запросом, что и сами комментарии.'
+        )
+
+    def test_09_comments_conditional_get(self, client, admin_client, admin,
+                                         user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{self.COMMENTS_URL_TEMPLATE}` с '
+            'актуальным `If-None-Match` возвращает ответ со статусом 304.'
+        )
+
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'new comment'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления комментария GET-запрос к '
+            f'`{self.COMMENTS_URL_TEMPLATE}` со старым `If-None-Match` '
+            'возвращает актуальные данные.'
+        )
+        check_pagination(url, response.json(), 2)
+
+    def test_10_comments_mismatched_title(self, client, admin_client, admin,
+                                          user_client,
+                                          django_assert_max_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        wrong_title_id = titles[1]['id']
+        urls = (
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=wrong_title_id, review_id=reviews[0]['id']
+            ),
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=wrong_title_id, review_id=reviews[0]['id'],
+                comment_id=comments[0]['id']
+            ),
+        )
+        for url in urls:
+            assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}` для отзыва другого '
+                'произведения возвращает ответ со статусом 404.'
+            )
+        response = user_client.post(urls[0], data={'text': 'text'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что POST-запрос к `{urls[0]}` для отзыва другого '
+            'произведения возвращает ответ со статусом 404.'
+        )
+
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        # Пользователь, отзыв с произведением, вставка комментария
+        # и обновление дат изменения отзыва и произведения.
+        with django_assert_max_num_queries(5):
+            response = user_client.post(url, data={'text': 'text'})
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_11_review_comments_count(self, client, admin_client, admin,
+                                      user_client, user, moderator_client,
+                                      moderator):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from reviews.models import Review
+
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        def get_counts():
+            response = client.get(reviews_url)
+            return {
+                review['id']: review['comments_count']
+                for review in response.json()['results']
+            }
+
+        first, second, third = (review['id'] for review in reviews)
+        assert get_counts() == {first: 3, second: 0, third: 0}, (
+            f'Проверьте, что в ответе `{reviews_url}` у каждого отзыва есть '
+            'поле `comments_count` с количеством комментариев.'
+        )
+        admin_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=first,
+            comment_id=comments[0]['id']
+        ))
+        assert get_counts()[first] == 2, (
+            'Проверьте, что `comments_count` уменьшается при удалении '
+            'комментария.'
+        )
+        etag = client.get(reviews_url)['ETag']
+        user_client.post(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=second
+            ),
+            data={'text': 'Новый комментарий'}
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после создания комментария GET-запрос к '
+            f'`{reviews_url}` со старым `If-None-Match` возвращает '
+            'актуальные данные.'
+        )
+        counts = {
+            review['id']: review['comments_count']
+            for review in response.json()['results']
+        }
+        assert counts[second] == 1, (
+            'Проверьте, что `comments_count` увеличивается при создании '
+            'комментария.'
+        )
+        etag = response['ETag']
+        user_client.delete(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=second,
+            comment_id=Review.objects.get(
+                pk=second
+            ).comments_review.get().pk
+        ))
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после удаления комментария GET-запрос к '
+            f'`{reviews_url}` со старым `If-None-Match` возвращает '
+            'актуальные данные.'
+        )
+        moderator.delete()
+        assert get_counts() == {first: 1, second: 0}, (
+            'Проверьте, что `comments_count` уменьшается при каскадном '
+            'удалении комментариев.'
+        )
+
+        call_command('recount_comments', '--check', stdout=StringIO())
+        Review.objects.filter(pk=first).update(comments_count=5)
+        with pytest.raises(CommandError):
+            call_command('recount_comments', '--check', stdout=StringIO())
+        call_command('recount_comments', stdout=StringIO())
+        assert get_counts()[first] == 1
+
+    def test_12_conditional_get_after_author_rename(self, client,
+                                                    admin_client, admin,
+                                                    user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        urls = (
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/',
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id'],
+                comment_id=comments[1]['id']
+            ),
+        )
+        etags = {url: client.get(url)['ETag'] for url in urls}
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после смены имени автора GET-запрос к '
+                f'`{url}` со старым `If-None-Match` возвращает актуальные '
+                'данные.'
+            )
+            assert 'renamed' in response.content.decode(), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'новое имя автора.'
+            )
+
+    def test_13_comments_cursor_pagination(self, client, admin_client,
+                                           admin):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from reviews.models import Comment
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client}
+        )
+        Comment.objects.bulk_create(
+            Comment(review_id=reviews[0]['id'], author=admin, text='text')
+            for _ in range(25)
+        )
+        # Две группы комментариев с одинаковой датой публикации: порядок
+        # внутри группы задаёт только id.
+        ids = list(Comment.objects.order_by('id').values_list('id', flat=True))
+        now = timezone.now()
+        Comment.objects.filter(pk__in=ids[::2]).update(pub_date=now)
+        Comment.objects.filter(pk__in=ids[1::2]).update(
+            pub_date=now - timedelta(hours=1)
+        )
+        expected = list(
+            Comment.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        assert 'count' in client.get(url).json(), (
+            f'Проверьте, что по умолчанию `{self.COMMENTS_URL_TEMPLATE}` '
+            'использует пагинацию limit/offset.'
+        )
+
+        pages = []
+        next_url = f'{url}?cursor=&limit=7'
+        while next_url:
+            response = client.get(next_url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data
+            pages.append([comment['id'] for comment in data['results']])
+            next_url = data['next']
+        assert sum(pages, []) == expected, (
+            'Проверьте, что курсорная пагинация '
+            f'`{self.COMMENTS_URL_TEMPLATE}` возвращает все комментарии '
+            'по порядку, без повторов и пропусков при одинаковой дате '
+            'публикации.'
+        )
+
+        previous_pages = []
+        previous_url = data['previous']
+        while previous_url:
+            data = client.get(previous_url).json()
+            previous_pages.insert(
+                0, [comment['id'] for comment in data['results']]
+            )
+            previous_url = data['previous']
+        assert previous_pages == pages[:-1], (
+            'Проверьте, что ссылка `previous` курсорной пагинации '
+            'возвращает предыдущую страницу.'
+        )
+
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,136 @@
+import csv
+import gzip
+import shutil
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, ImportCheckpoint, Review, Title
+)
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+SNAPSHOT_FIELDS = {
+    Category: ('id', 'name', 'slug'),
+    Genre: ('id', 'name', 'slug'),
+    Title: (
+        'id', 'name', 'year', 'category_id', 'score_sum', 'reviews_count'
+    ),
+    GenreTitle: ('id', 'title_id', 'genre_id'),
+    Review: ('id', 'title_id', 'author_id', 'text', 'score'),
+    Comment: ('id', 'review_id', 'author_id', 'text'),
+}
+
+
+def take_snapshot(django_user_model):
+    snapshot = {
+        model: list(model.objects.order_by('pk').values_list(*fields))
+        for model, fields in SNAPSHOT_FIELDS.items()
+    }
+    snapshot[django_user_model] = list(
+        django_user_model.objects.order_by('pk').values_list(
+            'id', 'username', 'email', 'role', 'bio'
+        )
+    )
+    return snapshot
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08LoadToBd:
+
+    def test_01_bulk_matches_row_by_row(self, django_user_model, capsys):
+        call_command('load_to_bd')
+        expected = take_snapshot(django_user_model)
+        assert expected[Review], (
+            'Проверьте, что команда `load_to_bd` загружает отзывы.'
+        )
+
+        call_command('flush', '--no-input')
+        call_command('load_to_bd', '--bulk', '--batch-size', '7')
+        assert take_snapshot(django_user_model) == expected, (
+            'Проверьте, что режим `--bulk` команды `load_to_bd` загружает '
+            'те же данные, что и построчная загрузка.'
+        )
+        assert 'строк/с' in capsys.readouterr().out, (
+            'Проверьте, что режим `--bulk` сообщает скорость загрузки.'
+        )
+
+    def test_02_resume_after_failure(self, django_user_model, tmp_path,
+                                     capsys):
+        call_command('load_to_bd')
+        expected = take_snapshot(django_user_model)
+        call_command('flush', '--no-input')
+
+        for csv_file in DATA_DIR.glob('*.csv'):
+            shutil.copy(csv_file, tmp_path)
+        with open(DATA_DIR / 'review.csv', encoding='utf-8') as file:
+            rows = list(csv.reader(file))
+        (tmp_path / 'review.csv').unlink()
+        broken_rows = [row.copy() for row in rows]
+        broken_rows[31][1] = '9999'
+        for data in (broken_rows, rows):
+            with gzip.open(tmp_path / 'review.csv.gz', 'wt',
+                           encoding='utf-8') as file:
+                csv.writer(file).writerows(data)
+            call_command(
+                'load_to_bd', '--resume', '--batch-size', '10',
+                '--data-dir', str(tmp_path)
+            )
+            if data is broken_rows:
+                assert Review.objects.count() == 30, (
+                    'Проверьте, что в режиме `--resume` команда '
+                    '`load_to_bd` фиксирует каждый загруженный пакет.'
+                )
+                assert ImportCheckpoint.objects.get(
+                    file_name=str((tmp_path / 'review.csv.gz').resolve())
+                ).rows_loaded == 30
+
+        assert take_snapshot(django_user_model) == expected, (
+            'Проверьте, что повторный запуск `load_to_bd --resume` '
+            'продолжает загрузку без дубликатов.'
+        )
+        assert 'уже загружена' in capsys.readouterr().out
+
+    def test_03_resume_checks_source(self, django_user_model, tmp_path,
+                                     capsys):
+        first_dir, second_dir = tmp_path / 'first', tmp_path / 'second'
+        for data_dir in (first_dir, second_dir):
+            shutil.copytree(DATA_DIR, data_dir)
+        call_command('load_to_bd', '--resume', '--data-dir', str(first_dir))
+        expected = take_snapshot(django_user_model)
+        capsys.readouterr()
+
+        checkpoints = list(ImportCheckpoint.objects.all())
+        call_command('flush', '--no-input')
+        ImportCheckpoint.objects.bulk_create(checkpoints)
+        call_command('load_to_bd', '--resume', '--data-dir', str(second_dir))
+        assert take_snapshot(django_user_model) == expected, (
+            'Проверьте, что контрольные точки `load_to_bd --resume` '
+            'привязаны к пути файла: другой каталог загружается заново.'
+        )
+        assert 'уже загружена' not in capsys.readouterr().out
+
+        category_path = second_dir / 'category.csv'
+        with open(category_path, encoding='utf-8') as file:
+            rows = list(csv.reader(file))
+        rows[1][1] = 'Новое название'
+        with open(category_path, 'w', encoding='utf-8', newline='') as file:
+            csv.writer(file).writerows(rows)
+        call_command('load_to_bd', '--resume', '--data-dir', str(second_dir))
+        assert 'изменился' in capsys.readouterr().out, (
+            'Проверьте, что `load_to_bd --resume` не продолжает загрузку '
+            'изменившегося файла.'
+        )
+        assert not Category.objects.filter(name='Новое название').exists()
+
+        checkpoints = list(ImportCheckpoint.objects.all())
+        call_command('flush', '--no-input')
+        ImportCheckpoint.objects.bulk_create(checkpoints)
+        call_command('load_to_bd', '--restart', '--data-dir', str(second_dir))
+        assert Category.objects.filter(name='Новое название').exists(), (
+            'Проверьте, что `load_to_bd --restart` сбрасывает контрольные '
+            'точки и загружает файлы заново.'
+        )
+        assert Review.objects.count() == len(expected[Review])
@@ -0,0 +1,99 @@
+import pytest
+from django.utils import timezone
+
+from api.mixins import PrefixSearchMixin
+from api.pagination import KeysetPagination
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRanking
+)
+from users.models import CustomUser
+
+KEYSET_ORDERING = ('-pub_date', '-id')
+
+
+def get_plan(queryset):
+    return queryset.explain().upper()
+
+
+def check_plan(queryset, index_name, description):
+    plan = get_plan(queryset)
+    assert index_name.upper() in plan, (
+        f'Проверьте, что {description} использует индекс `{index_name}`. '
+        f'План запроса: {plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        f'Проверьте, что {description} не сортирует строки во временном '
+        f'B-дереве. План запроса: {plan}'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryPlans:
+
+    @pytest.mark.parametrize('model, parent, index_name', (
+        (Review, 'title_id', 'review_title_pub_date_idx'),
+        (Comment, 'review_id', 'comment_review_pub_date_idx'),
+        (Review, 'author_id', 'review_author_pub_date_idx'),
+        (Comment, 'author_id', 'comment_author_pub_date_idx'),
+    ))
+    def test_01_nested_list_uses_composite_index(self, model, parent,
+                                                 index_name):
+        queryset = model.objects.filter(**{parent: 1}).order_by(
+            *KEYSET_ORDERING
+        )
+        check_plan(
+            queryset[:11], index_name,
+            f'первая страница списка {model.__name__} по `{parent}`'
+        )
+        key_filter = KeysetPagination.get_key_filter(
+            (timezone.now(), 100), KEYSET_ORDERING
+        )
+        check_plan(
+            queryset.filter(key_filter)[:11], index_name,
+            f'следующая страница списка {model.__name__} по `{parent}`'
+        )
+
+    @pytest.mark.parametrize('model, field', (
+        (Category, 'name_lower'),
+        (Genre, 'name_lower'),
+        (CustomUser, 'username_lower'),
+    ))
+    def test_02_prefix_search_uses_index(self, model, field):
+        view = PrefixSearchMixin()
+        view.prefix_search_field = field
+        plan = get_plan(
+            view.filter_by_prefix(model.objects.all(), 'фил')[:10]
+        )
+        assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что поиск по префиксу `{field}` модели '
+            f'{model.__name__} использует индекс. План запроса: {plan}'
+        )
+
+    def test_03_year_range_uses_index(self):
+        plan = get_plan(Title.objects.filter(year__gte=1990, year__lte=1999))
+        assert 'TITLE_YEAR_IDX' in plan, (
+            'Проверьте, что фильтр произведений по диапазону лет использует '
+            f'индекс `title_year_idx`. План запроса: {plan}'
+        )
+
+    @pytest.mark.parametrize('order, index_name', (
+        ('rating', 'ranking_rating_idx'),
+        ('reviews', 'ranking_reviews_count_idx'),
+    ))
+    def test_04_leaderboard_uses_index(self, order, index_name):
+        from api.views import TitleViewSet
+
+        queryset = TitleRanking.objects.filter(
+            scope=TitleRanking.Scope.GENRE, scope_id=1
+        ).select_related('title').order_by(
+            *TitleViewSet.leaderboard_orderings[order]
+        )
+        check_plan(
+            queryset[:10], index_name,
+            f'рейтинговая таблица с сортировкой `{order}`'
+        )
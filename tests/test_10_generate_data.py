@@ -0,0 +1,100 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F, Max, Min
+
+from reviews.models import Comment, Review, ScoreCount, Title, TitleRanking
+
+SCALE = '0.05'
+
+
+def generate(seed):
+    out = StringIO()
+    call_command(
+        'generate_data', '--scale', SCALE, '--seed', str(seed),
+        '--batch-size', '700', stdout=out,
+    )
+    return out.getvalue()
+
+
+def take_snapshot():
+    return (
+        list(Title.objects.order_by('pk').values_list(
+            'id', 'name', 'year', 'category_id', 'score_sum'
+        )),
+        list(Review.objects.order_by('pk').values_list(
+            'id', 'title_id', 'author_id', 'text', 'score'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'id', 'review_id', 'author_id', 'text'
+        )),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10GenerateData:
+
+    def test_01_generated_data_is_consistent(self, django_user_model):
+        output = generate(seed=1)
+        assert 'строк/с' in output, (
+            'Проверьте, что команда `generate_data` сообщает скорость '
+            'вставки.'
+        )
+        assert Review.objects.count() == 5000, (
+            'Проверьте, что команда `generate_data` создаёт число отзывов, '
+            'заданное масштабом.'
+        )
+        assert Comment.objects.exists()
+        assert not django_user_model.objects.filter(
+            username_lower=''
+        ).exists()
+
+        counts = sorted(
+            Title.objects.annotate(
+                count=Count('reviews_title')
+            ).values_list('count', flat=True)
+        )
+        assert counts[-1] >= 5 * counts[0], (
+            'Проверьте, что отзывы распределены по произведениям '
+            'по закону Ципфа: у популярных произведений отзывов намного '
+            'больше, чем у типичных.'
+        )
+
+        dates = Review.objects.aggregate(
+            first=Min('pub_date'), last=Max('pub_date'),
+            distinct=Count('pub_date', distinct=True),
+        )
+        assert (
+            dates['distinct'] >= 0.9 * Review.objects.count()
+            and (dates['last'] - dates['first']).days >= 365
+        ), (
+            'Проверьте, что команда `generate_data` распределяет даты '
+            'публикации отзывов по времени.'
+        )
+        assert Comment.objects.values('pub_date').distinct().count() > 1
+        assert not Comment.objects.filter(
+            pub_date__lt=F('review__pub_date')
+        ).exists(), (
+            'Проверьте, что комментарий опубликован не раньше отзыва.'
+        )
+
+        for command in (
+            'recount_ratings', 'recount_comments', 'refresh_rankings',
+            'rebuild_title_search',
+        ):
+            call_command(command, '--check', stdout=StringIO())
+        assert ScoreCount.objects.exists() and TitleRanking.objects.exists()
+
+    def test_02_generated_data_is_seedable(self):
+        generate(seed=7)
+        expected = take_snapshot()
+        call_command('flush', '--no-input')
+        generate(seed=7)
+        assert take_snapshot() == expected, (
+            'Проверьте, что команда `generate_data` с одним и тем же '
+            '`--seed` создаёт одинаковые данные.'
+        )
+        call_command('flush', '--no-input')
+        generate(seed=8)
+        assert take_snapshot() != expected